@@ -1,5 +1,7 @@
 import os
-from ayon_core.addon import AYONAddon, IHostAddon
+import sys
+
+from ayon_core.addon import AYONAddon, IHostAddon, click_wrap
 
 from .version import __version__
 
@@ -26,3 +28,52 @@ class LokiAddon(AYONAddon, IHostAddon):
 
     def get_workfile_extensions(self):
         return [".usd", ".usda", ".usdc", ".usdz"]
+
+    def cli(self, click_group):
+        click_group.add_command(cli_main.to_click_obj())
+
+
+@click_wrap.group(LokiAddon.name, help="Loki command line tools.")
+def cli_main():
+    pass
+
+
+@cli_main.command()
+@click_wrap.argument("workfiles", nargs=-1, required=True)
+@click_wrap.option(
+    "--workers",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Number of workfiles to publish in parallel."
+)
+@click_wrap.option(
+    "--folder-path",
+    default=None,
+    help="Folder path to publish for, defaults to the current context."
+)
+@click_wrap.option(
+    "--task",
+    "task_name",
+    default=None,
+    help="Task name to publish for, defaults to the current context."
+)
+def publish(workfiles, workers, folder_path, task_name):
+    """Publish Loki workfiles without starting the user interface."""
+    from .api.headless import publish_workfiles
+
+    results = publish_workfiles(
+        list(workfiles),
+        workers=workers,
+        folder_path=folder_path,
+        task_name=task_name
+    )
+    failed = False
+    for filepath, error in results.items():
+        if error:
+            failed = True
+            print(f"Failed: {filepath}: {error}")
+        else:
+            print(f"Published: {filepath}")
+    if failed:
+        sys.exit(1)
@@ -1,16 +1,20 @@
-from .pipeline import (
-    LokiHost
-)
+"""Loki host API.
 
-from .lib import (
-    maintained_selection
-)
+The attributes are imported from their submodules on first access, so that
+importing e.g. `ayon_loki.api.lib` doesn't also import the pipeline, the
+workfile IO and everything they depend on at Loki startup.
+"""
+import importlib
 
-from .workio import (
-    save_file,
-    current_file,
-    has_unsaved_changes
-)
+# Attribute name to the submodule it is imported from
+_LAZY_ATTRIBUTES = {
+    "LokiHost": ".pipeline",
+    "maintained_selection": ".lib",
+    "save_file": ".workio",
+    "current_file": ".workio",
+    "has_unsaved_changes": ".workio",
+    "wait_for_background_save": ".workio",
+}
 
 __all__ = [
     "LokiHost",
@@ -18,4 +22,20 @@ __all__ = [
     "save_file",
     "current_file",
     "has_unsaved_changes",
+    "wait_for_background_save",
 ]
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # Cache the attribute so `__getattr__` is only called once per name
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,192 @@
+"""Backends providing the current stage and the application around it.
+
+The integration accesses the application only through the active
+`StageBackend`. Inside Loki that is the `OpenDCCBackend`. Without an OpenDCC
+application, e.g. when publishing headless on the farm or when profiling
+the integration from plain Python, the `InMemoryBackend` holds the current
+stage instead.
+"""
+import logging
+from typing import Any, Optional, Union
+
+from pxr import Sdf, Usd
+
+try:
+    import opendcc.core
+except ImportError:
+    # Running headless without the OpenDCC libraries, e.g. on the farm
+    opendcc = None
+
+log = logging.getLogger(__name__)
+
+
+class StageBackend:
+    """Access to the current stage and the application holding it."""
+
+    name: str = ""
+
+    # Whether the backend runs an event loop with a user interface, which
+    # is required to e.g. load payloads or save in the background
+    interactive: bool = False
+
+    def is_available(self) -> bool:
+        return True
+
+    def get_current_stage(self) -> Optional[Usd.Stage]:
+        raise NotImplementedError
+
+    def set_current_stage(self, stage: Usd.Stage):
+        """Make the stage the current stage, closing the previous one."""
+        raise NotImplementedError
+
+    def open_stage(self, filepath: str) -> Usd.Stage:
+        """Open the file with all payloads loaded as the current stage."""
+        stage = Usd.Stage.Open(filepath)
+        self.set_current_stage(stage)
+        return stage
+
+    def get_main_window(self) -> Any:
+        return None
+
+    def get_selection(self) -> Any:
+        """Return the current selection, to restore with `set_selection`."""
+        return None
+
+    def set_selection(self, selection: Any):
+        pass
+
+    def get_selected_paths(self) -> list[Sdf.Path]:
+        """Return the paths of the fully selected prims."""
+        return []
+
+    def add_recent_file(self, filepath: str):
+        pass
+
+    def refresh_stage_list(self):
+        pass
+
+    def show_status(self, message: str, timeout: int = 0):
+        """Show the message in the status bar for `timeout` milliseconds."""
+        pass
+
+
+class OpenDCCBackend(StageBackend):
+    """The stage of the session of the running OpenDCC application."""
+
+    name = "opendcc"
+    interactive = True
+
+    @staticmethod
+    def get_application() -> Optional["opendcc.core.Application"]:
+        if opendcc is None:
+            return None
+        return opendcc.core.Application.instance()
+
+    def get_session(self) -> "opendcc.core.Session":
+        return self.get_application().get_session()
+
+    def is_available(self) -> bool:
+        return self.get_application() is not None
+
+    def get_current_stage(self) -> Optional[Usd.Stage]:
+        return self.get_session().get_current_stage()
+
+    def set_current_stage(self, stage: Usd.Stage):
+        session = self.get_session()
+        old_stage_id = session.get_current_stage_id()
+        session.set_current_stage(session.open_stage(stage))
+        if old_stage_id.IsValid():
+            session.close_stage(old_stage_id)
+
+    def open_stage(self, filepath: str) -> Usd.Stage:
+        self.get_session().open_stage(filepath)
+        return self.get_current_stage()
+
+    def get_main_window(self) -> Any:
+        return self.get_application().get_main_window()
+
+    def get_selection(self) -> Any:
+        return self.get_application().get_selection()
+
+    def set_selection(self, selection: Any):
+        import opendcc.cmds
+        opendcc.cmds.select(selection, replace=True)
+
+    def get_selected_paths(self) -> list[Sdf.Path]:
+        selection = self.get_application().get_selection()
+        return list(selection.get_fully_selected_paths())
+
+    def add_recent_file(self, filepath: str):
+        import opendcc.file_menu
+        opendcc.file_menu.add_recent_file(filepath)
+
+    def refresh_stage_list(self):
+        self.get_session().force_update_stage_list()
+
+    def show_status(self, message: str, timeout: int = 0):
+        self.get_main_window().statusBar().showMessage(message, timeout)
+
+
+class InMemoryBackend(StageBackend):
+    """A current stage held in memory, without any user interface."""
+
+    name = "memory"
+
+    def __init__(self, stage: Optional[Usd.Stage] = None):
+        self.stage: Optional[Usd.Stage] = stage
+        self.selection: list[Sdf.Path] = []
+
+    def get_current_stage(self) -> Optional[Usd.Stage]:
+        return self.stage
+
+    def set_current_stage(self, stage: Usd.Stage):
+        self.stage = stage
+
+    def get_selection(self) -> list[Sdf.Path]:
+        return list(self.selection)
+
+    def set_selection(self, selection: list[Sdf.Path]):
+        self.selection = list(selection)
+
+    def get_selected_paths(self) -> list[Sdf.Path]:
+        return list(self.selection)
+
+
+# Registered backends, in order of preference
+_BACKENDS: dict[str, StageBackend] = {}
+_ACTIVE_BACKEND: Optional[StageBackend] = None
+
+
+def register_backend(backend: StageBackend):
+    """Register a backend, replacing any backend with the same name."""
+    _BACKENDS[backend.name] = backend
+
+
+def get_backend() -> StageBackend:
+    """Return the active backend.
+
+    Unless a backend was activated with `set_backend`, this is the first
+    registered backend that is available.
+
+    """
+    if _ACTIVE_BACKEND is not None:
+        return _ACTIVE_BACKEND
+
+    for backend in _BACKENDS.values():
+        if backend.is_available():
+            return backend
+    raise RuntimeError("No stage backend available.")
+
+
+def set_backend(backend: Union[str, StageBackend, None]):
+    """Activate a backend by name or instance, or `None` to auto-detect."""
+    global _ACTIVE_BACKEND
+    if isinstance(backend, str):
+        if backend not in _BACKENDS:
+            raise ValueError(f"Unknown stage backend: {backend}")
+        backend = _BACKENDS[backend]
+    _ACTIVE_BACKEND = backend
+
+
+register_backend(OpenDCCBackend())
+register_backend(InMemoryBackend())
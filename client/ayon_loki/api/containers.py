@@ -0,0 +1,402 @@
+"""Container index for the local layer stack of a stage.
+
+Finding containers by `Sdf.Layer.Traverse` visits every spec of every layer
+on each query. The `ContainerIndex` traverses a layer once and afterwards
+only re-scans the spec paths reported as changed through USD notices, so a
+query costs time proportional to the number of containers instead of the
+number of specs.
+"""
+import logging
+import threading
+from typing import Any, Iterable, Iterator, Optional, Union
+
+from ayon_core.pipeline import AYON_CONTAINER_ID
+
+from pxr import Sdf, Tf, Usd
+
+from . import lib
+
+log = logging.getLogger(__name__)
+
+
+def get_spec_containers(
+    layer: Sdf.Layer,
+    path: Sdf.Path
+) -> list[dict[str, Any]]:
+    """Return the containers authored on the spec at `path` in `layer`.
+
+    A container is either AYON custom data on a property spec or AYON custom
+    data on any of the references in the reference list of a prim spec.
+
+    Arguments:
+        layer (Sdf.Layer): The layer to get the spec from.
+        path (Sdf.Path): The path of the spec in the layer.
+
+    Returns:
+        list[dict[str, Any]]: The container data found on the spec.
+
+    """
+    spec = layer.GetObjectAtPath(path)
+    containers: list[dict[str, Any]] = []
+
+    # Check for AYON metadata on property specs
+    if isinstance(spec, Sdf.PropertySpec):
+        data = spec.customData.get("AYON", {})
+        if data.get("id") == AYON_CONTAINER_ID:
+            spec_container = data
+            spec_container["spec"] = spec
+
+            # TODO: Are these required values?
+            spec_container["objectName"] = spec.name
+            spec_container["namespace"] = path.pathString
+            spec_container["name"] = layer.identifier
+
+            containers.append(spec_container)
+
+    elif isinstance(spec, Sdf.PrimSpec):
+        # Query references for potential containers from their metadata
+        for key in lib.USD_LIST_ATTRS:
+            for ref in getattr(spec.referenceList, key):
+                data = ref.customData.get("AYON", {})
+                if data.get("id") != AYON_CONTAINER_ID:
+                    continue
+
+                spec_container = data
+                spec_container["spec"] = spec
+                spec_container["reference"] = ref
+
+                # TODO: Are these required values?
+                spec_container["objectName"] = spec.name
+                spec_container["namespace"] = path.pathString
+                spec_container["name"] = layer.identifier
+
+                containers.append(spec_container)
+
+    return containers
+
+
+def scan_layer(
+    layer: Sdf.Layer,
+    root: Sdf.Path = Sdf.Path.absoluteRootPath
+) -> dict[Sdf.Path, list[dict[str, Any]]]:
+    """Traverse `layer` from `root` and return the containers per spec path.
+
+    Arguments:
+        layer (Sdf.Layer): The layer to traverse.
+        root (Sdf.Path): The path to start traversing from.
+
+    Returns:
+        dict[Sdf.Path, list[dict[str, Any]]]: Containers by spec path.
+
+    """
+    containers: dict[Sdf.Path, list[dict[str, Any]]] = {}
+
+    def _collect_containers(path: Sdf.Path):
+        spec_containers = get_spec_containers(layer, path)
+        if spec_containers:
+            containers[path] = spec_containers
+
+    layer.Traverse(root, _collect_containers)
+    return containers
+
+
+class _LayerEntry:
+    """Indexed containers of a single layer.
+
+    Paths are marked dirty from whichever thread edits the layer, so the
+    dirty state is only accessed while holding the lock.
+
+    Dirty paths are composed stage paths, while containers authored inside
+    a variant are indexed by their spec path, e.g. `/V{v=x}D`. Edits inside
+    a variant that is not selected are not reported on the stage at all.
+    So the prims outside any variant that own variant sets are tracked and
+    re-scanned including all their variants whenever the layer changes.
+
+    """
+
+    def __init__(self, layer: Sdf.Layer):
+        self.layer: Sdf.Layer = layer
+        self.containers: dict[Sdf.Path, list[dict[str, Any]]] = {}
+        self.variant_owners: set[Sdf.Path] = set()
+        self.dirty_paths: set[Sdf.Path] = set()
+        self.needs_rebuild: bool = True
+        self._lock = threading.Lock()
+
+    def mark_dirty(self, paths: list[Sdf.Path]):
+        with self._lock:
+            if self.needs_rebuild:
+                return
+            self.dirty_paths.update(paths)
+
+    def mark_variants_dirty(self):
+        with self._lock:
+            self.dirty_paths.update(self.variant_owners)
+
+    def mark_rebuild(self):
+        with self._lock:
+            self.needs_rebuild = True
+            self.dirty_paths = set()
+
+    def refresh(self):
+        """Re-scan the layer or only its dirty paths if anything changed."""
+        # Take the dirty state before scanning, so changes made while
+        # scanning are kept for the next refresh instead of being dropped
+        with self._lock:
+            needs_rebuild = self.needs_rebuild
+            dirty_paths, self.dirty_paths = self.dirty_paths, set()
+            self.needs_rebuild = False
+
+        if needs_rebuild:
+            self._rebuild()
+            return
+
+        if not dirty_paths:
+            return
+
+        # A path below a prim with variant sets may be authored inside any
+        # of its variants, so re-scan from the prim owning the variants
+        variant_owners = self.variant_owners
+        if variant_owners:
+            dirty_paths = {
+                next(
+                    (
+                        prefix for prefix in dirty_path.GetPrefixes()
+                        if prefix in variant_owners
+                    ),
+                    dirty_path
+                )
+                for dirty_path in dirty_paths
+            }
+
+        dirty_paths = Sdf.Path.RemoveDescendentPaths(list(dirty_paths))
+        if Sdf.Path.absoluteRootPath in dirty_paths:
+            self._rebuild()
+            return
+
+        variant_owners = set(variant_owners)
+        for dirty_path in dirty_paths:
+            # Remove anything previously indexed at or below the dirty path,
+            # including the specs inside its variants
+            for path in [
+                path for path in self.containers
+                if path.StripAllVariantSelections().HasPrefix(dirty_path)
+            ]:
+                del self.containers[path]
+            variant_owners.difference_update([
+                path for path in variant_owners if path.HasPrefix(dirty_path)
+            ])
+
+            if self.layer.GetObjectAtPath(dirty_path):
+                containers, owners = self._scan(dirty_path)
+                self.containers.update(containers)
+                variant_owners.update(owners)
+
+        with self._lock:
+            self.variant_owners = variant_owners
+
+    def _rebuild(self):
+        containers, variant_owners = self._scan(Sdf.Path.absoluteRootPath)
+        self.containers = containers
+        with self._lock:
+            self.variant_owners = variant_owners
+
+    def _scan(
+        self,
+        root: Sdf.Path
+    ) -> tuple[dict[Sdf.Path, list[dict[str, Any]]], set[Sdf.Path]]:
+        """Return the containers and variant owning prims below `root`."""
+        containers: dict[Sdf.Path, list[dict[str, Any]]] = {}
+        variant_owners: set[Sdf.Path] = set()
+
+        def _collect(path: Sdf.Path):
+            if path.IsPrimVariantSelectionPath():
+                owner = path.GetParentPath()
+                if not owner.ContainsPrimVariantSelection():
+                    variant_owners.add(owner)
+                return
+
+            spec_containers = get_spec_containers(self.layer, path)
+            if spec_containers:
+                containers[path] = spec_containers
+
+        self.layer.Traverse(root, _collect)
+        return containers, variant_owners
+
+
+class ContainerIndex:
+    """Persistent index of containers keyed by layer identifier and path.
+
+    Each layer is traversed fully only the first time it is queried. After
+    that the `Usd.Notice.ObjectsChanged` notices of the stages using the
+    layer mark the changed paths dirty, and only those are re-scanned on the
+    next query. The `Sdf.Notice.LayersDidChangeSentPerLayer` notices of a
+    layer mark its prims with variant sets dirty, as edits inside variants
+    that are not selected are not reported by the stage. A layer whose
+    content gets replaced or reloaded is rebuilt.
+
+    """
+
+    def __init__(self):
+        self._entries: dict[str, _LayerEntry] = {}
+        self._layer_cache: dict[tuple[str, str], Sdf.Layer] = {}
+        self._listeners: list[Tf.Notice.Listener] = []
+
+    def register(self):
+        """Start listening to USD notices to keep the index up to date."""
+        if self._listeners:
+            return
+
+        self._listeners = [
+            Tf.Notice.RegisterGlobally(
+                Usd.Notice.ObjectsChanged, self._on_objects_changed),
+            Tf.Notice.RegisterGlobally(
+                Sdf.Notice.LayersDidChangeSentPerLayer,
+                self._on_layer_changed),
+            # This also catches `Sdf.Notice.LayerDidReloadContent`
+            Tf.Notice.RegisterGlobally(
+                Sdf.Notice.LayerDidReplaceContent,
+                self._on_layer_content_replaced),
+        ]
+
+    def deregister(self):
+        """Stop listening to USD notices and clear the index."""
+        for listener in self._listeners:
+            listener.Revoke()
+        self._listeners.clear()
+        self.clear()
+
+    def clear(self):
+        self._entries.clear()
+        self._layer_cache.clear()
+
+    def iter_containers(
+        self,
+        stage: Usd.Stage,
+        loader: Optional[Union[str, type]] = None,
+        representation_ids: Optional[Iterable[str]] = None,
+        layers: Optional[Iterable[Union[str, Sdf.Layer]]] = None
+    ) -> Iterator[dict[str, Any]]:
+        """Yield the containers in the local layer stack of `stage`.
+
+        Containers are yielded per layer as soon as that layer is indexed, in
+        layer stack order. Layers excluded by `layers` are never scanned, and
+        closing the generator early cancels scanning of the remaining layers
+        so e.g. `next()` for a first match only pays for the layers it needs.
+
+        The layers are scanned on the calling thread, so they are never
+        traversed while the caller edits them.
+
+        Arguments:
+            stage (Usd.Stage): The stage to get the containers for.
+            loader (Optional[Union[str, type]]): Only yield containers loaded
+                by this loader, by class or class name.
+            representation_ids (Optional[Iterable[str]]): Only yield
+                containers of these representations.
+            layers (Optional[Iterable[Union[str, Sdf.Layer]]]): Only yield
+                containers from these layers, by layer or identifier.
+
+        Yields:
+            dict[str, Any]: A copy of the indexed container data.
+
+        """
+        self.register()
+
+        if isinstance(loader, type):
+            loader = loader.__name__
+        if representation_ids is not None:
+            representation_ids = set(representation_ids)
+        if layers is not None:
+            layers = {
+                layer if isinstance(layer, str) else layer.identifier
+                for layer in layers
+            }
+
+        entries = self._get_entries(self._get_local_layers(stage))
+
+        if layers is not None:
+            entries = [
+                entry for entry in entries
+                if entry.layer.identifier in layers
+            ]
+
+        for entry in entries:
+            entry.refresh()
+            for spec_containers in list(entry.containers.values()):
+                for container in spec_containers:
+                    if (
+                        loader is not None
+                        and container.get("loader") != loader
+                    ):
+                        continue
+                    if (
+                        representation_ids is not None
+                        and container.get("representation")
+                        not in representation_ids
+                    ):
+                        continue
+                    yield dict(container)
+
+    def _get_entries(self, layers: list[Sdf.Layer]) -> list[_LayerEntry]:
+        identifiers = {layer.identifier for layer in layers}
+
+        # Stop tracking layers that are no longer part of the layer stack
+        for identifier in list(self._entries):
+            if identifier not in identifiers:
+                del self._entries[identifier]
+
+        entries: list[_LayerEntry] = []
+        for layer in layers:
+            entry = self._entries.get(layer.identifier)
+            if entry is None or entry.layer != layer:
+                entry = _LayerEntry(layer)
+                self._entries[layer.identifier] = entry
+            entries.append(entry)
+        return entries
+
+    def _get_local_layers(self, stage: Usd.Stage) -> list[Sdf.Layer]:
+        # Iterate all "local scene layers" which we'll consider to be the
+        # root layer and any (nested) sublayers. We do not traverse into
+        # references or payloads assuming they are completely external.
+        layers = lib.get_layer_stack(
+            stage.GetRootLayer(),
+            muted_layers=stage.GetMutedLayers(),
+            layer_cache=self._layer_cache
+        )
+
+        # Do not keep layers alive that are not in the layer stack anymore
+        for key, layer in list(self._layer_cache.items()):
+            if layer not in layers:
+                del self._layer_cache[key]
+
+        return layers
+
+    def _on_objects_changed(self, notice, stage: Usd.Stage):
+        if not self._entries:
+            return
+
+        paths = list(notice.GetResyncedPaths())
+        paths.extend(notice.GetChangedInfoOnlyPaths())
+        if not paths:
+            return
+
+        for entry in self._entries.values():
+            if stage.HasLocalLayer(entry.layer):
+                entry.mark_dirty(paths)
+
+    def _on_layer_changed(self, notice, layer: Sdf.Layer):
+        entry = self._entries.get(layer.identifier)
+        if entry is not None and entry.variant_owners:
+            entry.mark_variants_dirty()
+
+    def _on_layer_content_replaced(self, notice, layer: Sdf.Layer):
+        entry = self._entries.get(layer.identifier)
+        if entry is not None:
+            entry.mark_rebuild()
+
+
+_CONTAINER_INDEX = ContainerIndex()
+
+
+def get_container_index() -> ContainerIndex:
+    """Return the container index shared by the Loki integration."""
+    return _CONTAINER_INDEX
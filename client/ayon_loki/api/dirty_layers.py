@@ -0,0 +1,132 @@
+"""Track the dirty layers in the local layer stack of a stage.
+
+Checking `layer.dirty` for every layer in the layer stack on each query
+gets expensive for large layer stacks. The `DirtyLayerTracker` instead keeps
+the set of dirty layers up to date through `Sdf.Notice.LayerDirtinessChanged`
+so a query only has to look at the layers that are actually dirty.
+"""
+import logging
+
+from pxr import Sdf, Tf, Usd
+
+log = logging.getLogger(__name__)
+
+
+class DirtyLayerTracker:
+    """Set of dirty layer identifiers kept up to date with USD notices.
+
+    On registration the loaded layers are checked once to find the layers
+    that are already dirty. After that only the layers that send a
+    dirtiness change notice are updated.
+
+    Layers saved from a snapshot, e.g. by a background save, stay dirty in
+    USD. These can be marked clean until their content changes again.
+
+    """
+
+    def __init__(self):
+        # Dirty layer identifiers, as dict to keep the order they got dirty
+        self._dirty: dict[str, None] = {}
+        # Dirty layer identifiers whose current content is saved
+        self._clean: set[str] = set()
+        self._listeners: list[Tf.Notice.Listener] = []
+
+    def register(self):
+        """Start listening to USD notices to track dirty layers."""
+        if self._listeners:
+            return
+
+        self._listeners = [
+            Tf.Notice.RegisterGlobally(
+                Sdf.Notice.LayerDirtinessChanged,
+                self._on_layer_dirtiness_changed),
+            Tf.Notice.RegisterGlobally(
+                Sdf.Notice.LayerIdentifierDidChange,
+                self._on_layer_identifier_changed),
+            Tf.Notice.RegisterGlobally(
+                Sdf.Notice.LayersDidChangeSentPerLayer,
+                self._on_layer_changed),
+        ]
+
+        # Find the layers that got dirty before we started listening
+        self._dirty = {
+            layer.identifier: None
+            for layer in Sdf.Layer.GetLoadedLayers()
+            if layer.dirty
+        }
+
+    def deregister(self):
+        """Stop listening to USD notices and clear the tracked layers."""
+        for listener in self._listeners:
+            listener.Revoke()
+        self._listeners.clear()
+        self._dirty.clear()
+        self._clean.clear()
+
+    def mark_clean(self, layer: Sdf.Layer):
+        """Consider the layer clean until its content changes again."""
+        self._clean.add(layer.identifier)
+
+    def mark_dirty(self, layer: Sdf.Layer):
+        """Undo `mark_clean`, e.g. when saving the layer failed."""
+        self._clean.discard(layer.identifier)
+
+    def get_dirty_layers(self, stage: Usd.Stage) -> list[Sdf.Layer]:
+        """Return the dirty layers in the local layer stack of `stage`.
+
+        The session layer is not included since it is never saved.
+
+        Arguments:
+            stage (Usd.Stage): The stage to get the dirty layers for.
+
+        Returns:
+            list[Sdf.Layer]: The dirty layers, in the order they got dirty.
+
+        """
+        self.register()
+
+        session_layer = stage.GetSessionLayer()
+        layers = []
+        for identifier in list(self._dirty):
+            layer = Sdf.Layer.Find(identifier)
+            if layer is None or not layer.dirty:
+                # The layer got released or we missed it getting clean
+                self._dirty.pop(identifier, None)
+                self._clean.discard(identifier)
+                continue
+
+            if identifier in self._clean:
+                continue
+
+            if layer != session_layer and stage.HasLocalLayer(layer):
+                layers.append(layer)
+        return layers
+
+    def has_dirty_layers(self, stage: Usd.Stage) -> bool:
+        """Return whether any layer in the local layer stack is dirty."""
+        return bool(self.get_dirty_layers(stage))
+
+    def _on_layer_dirtiness_changed(self, notice, layer: Sdf.Layer):
+        if layer.dirty:
+            self._dirty[layer.identifier] = None
+        else:
+            self._dirty.pop(layer.identifier, None)
+            self._clean.discard(layer.identifier)
+
+    def _on_layer_identifier_changed(self, notice, layer: Sdf.Layer):
+        if self._dirty.pop(notice.oldIdentifier, False) is None:
+            self._dirty[notice.newIdentifier] = None
+        # The layer is not saved to its new file path yet
+        self._clean.discard(notice.oldIdentifier)
+
+    def _on_layer_changed(self, notice, layer: Sdf.Layer):
+        if self._clean:
+            self._clean.discard(layer.identifier)
+
+
+_DIRTY_LAYER_TRACKER = DirtyLayerTracker()
+
+
+def get_dirty_layer_tracker() -> DirtyLayerTracker:
+    """Return the dirty layer tracker shared by the Loki integration."""
+    return _DIRTY_LAYER_TRACKER
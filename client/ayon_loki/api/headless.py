@@ -0,0 +1,149 @@
+"""Publish Loki workfiles without the OpenDCC application.
+
+The workfile is opened as the current stage of the `InMemoryBackend`, so
+the creators and publish plugins run through the same backend interface as
+they do in the UI. Each workfile of a batch is published in a fresh process
+so many workfiles publish in parallel on a single farm node, and caches like
+the container index never carry over from one workfile to the next.
+"""
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+from typing import Optional
+
+import pyblish.api
+import pyblish.util
+
+from ayon_core.pipeline import install_host, registered_host
+from ayon_core.pipeline.create import CreateContext
+
+from .backends import set_backend
+from .pipeline import LokiHost
+
+log = logging.getLogger(__name__)
+
+
+def publish_workfile(
+    filepath: str,
+    folder_path: Optional[str] = None,
+    task_name: Optional[str] = None
+):
+    """Open the workfile in memory and publish it in the current process.
+
+    Arguments:
+        filepath (str): The workfile to publish.
+        folder_path (Optional[str]): The folder path to publish for,
+            defaults to the current context.
+        task_name (Optional[str]): The task name to publish for, defaults
+            to the current context.
+
+    Raises:
+        RuntimeError: If any publish plugin failed.
+
+    """
+    os.environ["AYON_HOST_NAME"] = "loki"
+    if folder_path:
+        os.environ["AYON_FOLDER_PATH"] = folder_path
+    if task_name:
+        os.environ["AYON_TASK_NAME"] = task_name
+
+    set_backend("memory")
+    host = registered_host()
+    if not isinstance(host, LokiHost):
+        host = LokiHost()
+        install_host(host)
+    host.open_workfile(filepath)
+
+    create_context = CreateContext(host, headless=True)
+    pyblish_context = pyblish.api.Context()
+    pyblish_context.data["create_context"] = create_context
+    for result in pyblish.util.publish_iter(
+        pyblish_context, create_context.publish_plugins
+    ):
+        if result["error"]:
+            raise RuntimeError(
+                f"Failed {result['plugin'].__name__}: {result['error']}"
+            )
+    log.info(f"Published workfile: {filepath}")
+
+
+def _publish_workfile_in_process(
+    connection: multiprocessing.connection.Connection,
+    filepath: str,
+    folder_path: Optional[str],
+    task_name: Optional[str]
+):
+    """Publish the workfile and send the error message, or None, back."""
+    error = None
+    try:
+        publish_workfile(filepath, folder_path, task_name)
+    except Exception as exc:
+        log.error(f"Publishing failed: {filepath}", exc_info=True)
+        error = str(exc)
+    connection.send(error)
+    connection.close()
+
+
+def publish_workfiles(
+    filepaths: list[str],
+    workers: int = 1,
+    folder_path: Optional[str] = None,
+    task_name: Optional[str] = None
+) -> dict[str, Optional[str]]:
+    """Publish the workfiles in parallel, each in a separate process.
+
+    Arguments:
+        filepaths (list[str]): The workfiles to publish.
+        workers (int): Number of workfiles to publish at the same time.
+        folder_path (Optional[str]): The folder path to publish for,
+            defaults to the current context.
+        task_name (Optional[str]): The task name to publish for, defaults
+            to the current context.
+
+    Returns:
+        dict[str, Optional[str]]: The error message per workfile, or None
+            if it published successfully.
+
+    """
+    results: dict[str, Optional[str]] = {}
+    workers = max(1, workers)
+
+    # Spawn clean processes instead of forking the USD and Qt state, and
+    # publish each workfile in a new process. The processes are started
+    # directly because pools only replace their worker processes after each
+    # task with `max_tasks_per_child` from Python 3.11 on.
+    context = multiprocessing.get_context("spawn")
+    pending = list(filepaths)
+    running: dict[
+        multiprocessing.connection.Connection,
+        tuple[multiprocessing.process.BaseProcess, str]
+    ] = {}
+    while pending or running:
+        while pending and len(running) < workers:
+            filepath = pending.pop(0)
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_publish_workfile_in_process,
+                args=(sender, filepath, folder_path, task_name),
+                name=f"ayon_loki_publish_{os.path.basename(filepath)}"
+            )
+            process.start()
+            # Only the child holds the sending end, so the receiver gets
+            # EOF if the child dies without sending a result
+            sender.close()
+            running[receiver] = (process, filepath)
+
+        for receiver in multiprocessing.connection.wait(list(running)):
+            process, filepath = running.pop(receiver)
+            try:
+                error = receiver.recv()
+            except EOFError:
+                # The process died without sending a result, e.g. it crashed
+                process.join()
+                error = f"Publish process exited with code {process.exitcode}"
+            receiver.close()
+            process.join()
+            results[filepath] = error
+
+    return {filepath: results[filepath] for filepath in filepaths}
@@ -0,0 +1,125 @@
+"""Cached access to the custom layer data of layers.
+
+Reading `Sdf.Layer.customLayerData` converts the whole dictionary to Python
+on every call and writing it back always dirties the layer and sends change
+notices, even when nothing changed. The `LayerDataCache` keeps the custom
+layer data per layer until a USD notice reports it changed, and only writes
+a value when it differs from the stored value.
+"""
+import copy
+import logging
+from typing import Any
+
+from pxr import Sdf, Tf
+
+log = logging.getLogger(__name__)
+
+
+class LayerDataCache:
+    """Custom layer data per layer identifier, kept valid with USD notices."""
+
+    def __init__(self):
+        self._data: dict[str, dict[str, Any]] = {}
+        self._listeners: list[Tf.Notice.Listener] = []
+
+    def register(self):
+        """Start listening to USD notices to invalidate the cache."""
+        if self._listeners:
+            return
+
+        self._listeners = [
+            Tf.Notice.RegisterGlobally(
+                Sdf.Notice.LayerInfoDidChange,
+                self._on_layer_info_changed),
+            # This also catches `Sdf.Notice.LayerDidReloadContent`
+            Tf.Notice.RegisterGlobally(
+                Sdf.Notice.LayerDidReplaceContent,
+                self._on_layer_content_replaced),
+            Tf.Notice.RegisterGlobally(
+                Sdf.Notice.LayerIdentifierDidChange,
+                self._on_layer_identifier_changed),
+        ]
+
+    def deregister(self):
+        """Stop listening to USD notices and clear the cache."""
+        for listener in self._listeners:
+            listener.Revoke()
+        self._listeners.clear()
+        self.clear()
+
+    def clear(self):
+        self._data.clear()
+
+    def _get_layer_data(self, layer: Sdf.Layer) -> dict[str, Any]:
+        self.register()
+        data = self._data.get(layer.identifier)
+        if data is None:
+            data = dict(layer.customLayerData)
+            self._data[layer.identifier] = data
+        return data
+
+    def get(self, layer: Sdf.Layer, key: str, default: Any = None) -> Any:
+        """Return a copy of the value stored under `key` in the layer."""
+        data = self._get_layer_data(layer)
+        if key not in data:
+            return default
+        return copy.deepcopy(data[key])
+
+    def set(self, layer: Sdf.Layer, key: str, value: Any) -> bool:
+        """Store the value under `key` if it differs from the stored value.
+
+        Returns:
+            bool: Whether the layer was changed.
+
+        """
+        data = self._get_layer_data(layer)
+        if key in data and data[key] == value:
+            return False
+
+        layer_data = layer.customLayerData
+        layer_data[key] = value
+        layer.customLayerData = layer_data
+
+        # Cache the written value, since the change notice invalidated it
+        data = dict(data)
+        data[key] = copy.deepcopy(value)
+        self._data[layer.identifier] = data
+        return True
+
+    def remove(self, layer: Sdf.Layer, key: str) -> bool:
+        """Remove the value stored under `key`, if any.
+
+        Returns:
+            bool: Whether the layer was changed.
+
+        """
+        data = self._get_layer_data(layer)
+        if key not in data:
+            return False
+
+        layer_data = layer.customLayerData
+        layer_data.pop(key, None)
+        layer.customLayerData = layer_data
+
+        data = dict(data)
+        data.pop(key, None)
+        self._data[layer.identifier] = data
+        return True
+
+    def _on_layer_info_changed(self, notice, layer: Sdf.Layer):
+        if notice.key() == "customLayerData":
+            self._data.pop(layer.identifier, None)
+
+    def _on_layer_content_replaced(self, notice, layer: Sdf.Layer):
+        self._data.pop(layer.identifier, None)
+
+    def _on_layer_identifier_changed(self, notice, layer: Sdf.Layer):
+        self._data.pop(notice.oldIdentifier, None)
+
+
+_LAYER_DATA_CACHE = LayerDataCache()
+
+
+def get_layer_data_cache() -> LayerDataCache:
+    """Return the layer data cache shared by the Loki integration."""
+    return _LAYER_DATA_CACHE
@@ -1,16 +1,38 @@
 """Library functions for ShapeFX Loki."""
 import contextlib
+import copy
+import json
+import logging
+from typing import Any, Iterable, Optional
 
-from ayon_core.lib import NumberDef
-from ayon_core.pipeline.context_tools import get_current_task_entity
+import ayon_api
+from ayon_core.lib import NumberDef, register_event_callback
+from ayon_core.pipeline import (
+    AYON_INSTANCE_ID,
+    AVALON_INSTANCE_ID,
+    get_current_context,
+)
 
-from pxr import Sdf, Usd
+from pxr import Sdf, Tf, Usd
 
-import opendcc.core
+from .backends import OpenDCCBackend, get_backend
+
+log = logging.getLogger(__name__)
 
 AYON_CONTAINERS = "AYON_CONTAINERS"
+AYON_INSTANCES_ROOT = Sdf.Path("/AYON_Instances")
+# Name of the `Usd.CollectionAPI` on instance prims holding their members
+INSTANCE_COLLECTION_NAME = "instance"
 JSON_PREFIX = "JSON::"
 
+# Instance data is stored as a single custom data dictionary on the prim
+INSTANCE_DATA_KEY = "AYON"
+INSTANCE_DATA_VERSION = 1
+INSTANCE_DATA_VERSION_KEY = "schema_version"
+INSTANCE_DATA_JSON_KEY = "json_data"
+# Namespace of the legacy one attribute per key instance data layout
+INSTANCE_LEGACY_NAMESPACE = "ayon:"
+
 # USD ReferenceList/PayloadList keys
 USD_LIST_ATTRS = [
     "addedItems", 
@@ -22,13 +44,501 @@ USD_LIST_ATTRS = [
 ]
 
 
-def get_session() -> opendcc.core.Session:
-    app = opendcc.core.Application.instance()
-    return app.get_session()
+def get_session():
+    """Return the OpenDCC session, if running inside OpenDCC."""
+    backend = get_backend()
+    if not isinstance(backend, OpenDCCBackend):
+        return None
+    return backend.get_session()
 
 
 def get_current_stage() -> Usd.Stage:
-    return get_session().get_current_stage()
+    return get_backend().get_current_stage()
+
+
+class ContextEntityCache:
+    """Folder and task entities per project, folder path and task name.
+
+    The entities are fetched from the server once per context, and the
+    cache is cleared when the AYON context changes to pick up any changes
+    made on the server since.
+
+    """
+
+    def __init__(self):
+        self._folder_entities: dict[tuple[str, str], Optional[dict]] = {}
+        self._task_entities: dict[tuple[str, str, str], Optional[dict]] = {}
+        self._registered = False
+
+    def register(self):
+        """Start clearing the cache when the AYON context changes."""
+        if self._registered:
+            return
+        register_event_callback("taskChanged", self._on_task_changed)
+        self._registered = True
+
+    def clear(self):
+        self._folder_entities.clear()
+        self._task_entities.clear()
+
+    def _get_folder_entity(
+        self, project_name: str, folder_path: str
+    ) -> Optional[dict[str, Any]]:
+        key = (project_name, folder_path)
+        if key not in self._folder_entities:
+            self._folder_entities[key] = ayon_api.get_folder_by_path(
+                project_name, folder_path
+            )
+        return self._folder_entities[key]
+
+    def get_folder_entity(
+        self, project_name: str, folder_path: str
+    ) -> Optional[dict[str, Any]]:
+        """Return a copy of the folder entity, if it exists."""
+        self.register()
+        if not folder_path:
+            return None
+        return copy.deepcopy(
+            self._get_folder_entity(project_name, folder_path)
+        )
+
+    def get_task_entity(
+        self, project_name: str, folder_path: str, task_name: str
+    ) -> Optional[dict[str, Any]]:
+        """Return a copy of the task entity, if it exists."""
+        self.register()
+        if not folder_path or not task_name:
+            return None
+
+        key = (project_name, folder_path, task_name)
+        if key not in self._task_entities:
+            folder_entity = self._get_folder_entity(project_name, folder_path)
+            task_entity = None
+            if folder_entity:
+                task_entity = ayon_api.get_task_by_name(
+                    project_name, folder_entity["id"], task_name
+                )
+            self._task_entities[key] = task_entity
+        return copy.deepcopy(self._task_entities[key])
+
+    def _on_task_changed(self):
+        self.clear()
+
+
+_CONTEXT_ENTITY_CACHE = ContextEntityCache()
+
+
+def get_context_entity_cache() -> ContextEntityCache:
+    """Return the context entity cache shared by the Loki integration."""
+    return _CONTEXT_ENTITY_CACHE
+
+
+def get_current_task_entity() -> Optional[dict[str, Any]]:
+    """Return the task entity of the current context, cached per context."""
+    context = get_current_context()
+    return get_context_entity_cache().get_task_entity(
+        context["project_name"],
+        context["folder_path"],
+        context["task_name"],
+    )
+
+
+def get_layer_stack(
+    root_layer: Sdf.Layer,
+    muted_layers: Optional[Iterable[str]] = None,
+    layer_cache: Optional[dict[tuple[str, str], Sdf.Layer]] = None
+) -> list[Sdf.Layer]:
+    """Return the root layer and all its nested sublayers, strongest first.
+
+    Sublayer paths are resolved relative to the layer that authored them.
+    Each unique layer is visited only once, so sublayer cycles and layers
+    that are sublayered multiple times do not repeat. Muted layers and their
+    sublayers are skipped.
+
+    Arguments:
+        root_layer (Sdf.Layer): The layer to start from.
+        muted_layers (Optional[Iterable[str]]): Identifiers of layers to
+            consider muted, e.g. `Usd.Stage.GetMutedLayers()`. Layers muted
+            through `Sdf.Layer.SetMuted` are always skipped.
+        layer_cache (Optional[dict[tuple[str, str], Sdf.Layer]]): Cache of
+            opened layers by anchor layer identifier and sublayer path to
+            avoid resolving sublayer paths again on repeated calls.
+
+    Returns:
+        list[Sdf.Layer]: The layers in the layer stack.
+
+    """
+    muted = set(Sdf.Layer.GetMutedLayers())
+    if muted_layers:
+        muted.update(muted_layers)
+    if layer_cache is None:
+        layer_cache = {}
+
+    def _open_layer(key: tuple[str, str]) -> Optional[Sdf.Layer]:
+        layer = layer_cache.get(key)
+        if layer is None or layer.expired:
+            layer = Sdf.Layer.FindOrOpen(key[1])
+            if layer:
+                layer_cache[key] = layer
+        return layer
+
+    layers: list[Sdf.Layer] = []
+    visited: set[str] = set()
+
+    def _visit(layer: Sdf.Layer, ancestors: tuple[str, ...]):
+        visited.add(layer.identifier)
+        layers.append(layer)
+
+        for path in layer.subLayerPaths:
+            resolved_path = Sdf.ComputeAssetPathRelativeToLayer(layer, path)
+            if resolved_path in muted:
+                continue
+            sublayer = _open_layer((layer.identifier, resolved_path))
+            if not sublayer:
+                log.warning(
+                    f"Unable to open sublayer @{resolved_path}@ of "
+                    f"{layer.identifier}"
+                )
+                continue
+
+            identifier = sublayer.identifier
+            if identifier in ancestors:
+                log.warning(f"Skipping cyclic sublayer @{identifier}@")
+                continue
+            if identifier in visited or identifier in muted:
+                continue
+            _visit(sublayer, ancestors + (identifier,))
+
+    _visit(root_layer, (root_layer.identifier,))
+    return layers
+
+
+def _encode_instance_value(value):
+    """Encode value so it can be stored as USD custom data."""
+    if isinstance(value, str):
+        if value.startswith(JSON_PREFIX):
+            return JSON_PREFIX + json.dumps(value)
+        return value
+    if isinstance(value, (bool, int, float)):
+        return value
+    # None, lists and dictionaries can not be reliably stored as USD values
+    return JSON_PREFIX + json.dumps(value)
+
+
+def _decode_instance_value(value):
+    if isinstance(value, str) and value.startswith(JSON_PREFIX):
+        return json.loads(value[len(JSON_PREFIX):])
+    return value
+
+
+def write_instance_data(
+    spec: Sdf.PrimSpec,
+    data: dict,
+    as_json: bool = False
+):
+    """Store the instance data on the prim spec.
+
+    All data is stored as a single custom data dictionary on the prim with
+    a schema version. Values that can not be stored as USD values, like
+    lists, dictionaries or None, are stored as `JSON_PREFIX` strings. With
+    `as_json` all data is stored as one such string instead, except `id`
+    and `creator_identifier` which instance discovery needs.
+
+    Any instance data in the legacy layout of one attribute per key is
+    removed from the spec.
+
+    Arguments:
+        spec (Sdf.PrimSpec): The instance prim spec.
+        data (dict): The instance data to store.
+        as_json (bool): Whether to store the data as a single JSON string.
+
+    """
+    stored = {INSTANCE_DATA_VERSION_KEY: INSTANCE_DATA_VERSION}
+    if as_json:
+        for key in ("id", "creator_identifier"):
+            if key in data:
+                stored[key] = data[key]
+        stored[INSTANCE_DATA_JSON_KEY] = JSON_PREFIX + json.dumps(data)
+    else:
+        for key, value in data.items():
+            stored[key] = _encode_instance_value(value)
+
+    with Sdf.ChangeBlock():
+        spec.customData[INSTANCE_DATA_KEY] = stored
+        for attr_spec in _get_legacy_instance_attributes(spec):
+            del spec.properties[attr_spec.name]
+
+
+def update_instance_data(
+    spec: Sdf.PrimSpec,
+    values: dict,
+    removed_keys: Iterable[str] = (),
+    as_json: bool = False
+):
+    """Update only the given keys of the instance data stored on the spec.
+
+    Unchanged values are not decoded and encoded again and the spec is not
+    edited at all when the stored data ends up the same. Data that is not
+    stored in the current layout is rewritten completely.
+
+    Arguments:
+        spec (Sdf.PrimSpec): The instance prim spec.
+        values (dict): The new values by key.
+        removed_keys (Iterable[str]): Keys to remove from the data.
+        as_json (bool): Whether the data is stored as a single JSON string.
+
+    """
+    stored = spec.customData.get(INSTANCE_DATA_KEY)
+    if (
+        stored is None
+        or stored.get(INSTANCE_DATA_VERSION_KEY) != INSTANCE_DATA_VERSION
+        or (INSTANCE_DATA_JSON_KEY in stored) != as_json
+    ):
+        data = read_instance_data(spec)
+        data.update(values)
+        for key in removed_keys:
+            data.pop(key, None)
+        write_instance_data(spec, data, as_json=as_json)
+        return
+
+    new_stored = dict(stored)
+    if as_json:
+        data = _decode_instance_value(new_stored[INSTANCE_DATA_JSON_KEY])
+        data.update(values)
+        for key in removed_keys:
+            data.pop(key, None)
+        new_stored[INSTANCE_DATA_JSON_KEY] = JSON_PREFIX + json.dumps(data)
+        for key in ("id", "creator_identifier"):
+            if key in values:
+                new_stored[key] = values[key]
+    else:
+        for key, value in values.items():
+            new_stored[key] = _encode_instance_value(value)
+        for key in removed_keys:
+            new_stored.pop(key, None)
+
+    if new_stored != stored:
+        spec.customData[INSTANCE_DATA_KEY] = new_stored
+
+
+def read_instance_data(spec: Sdf.PrimSpec) -> dict:
+    """Return the instance data stored on the prim spec.
+
+    This reads instance data written by `write_instance_data` and instance
+    data in the legacy layout of one attribute per key.
+
+    Arguments:
+        spec (Sdf.PrimSpec): The instance prim spec.
+
+    Returns:
+        dict: The instance data, empty if the spec holds none.
+
+    """
+    stored = spec.customData.get(INSTANCE_DATA_KEY)
+    if stored is None:
+        return {
+            attr_spec.name[len(INSTANCE_LEGACY_NAMESPACE):]:
+                _decode_instance_value(attr_spec.default)
+            for attr_spec in _get_legacy_instance_attributes(spec)
+        }
+
+    # Data without a schema version has the same layout as version 1
+    stored.pop(INSTANCE_DATA_VERSION_KEY, None)
+    json_data = stored.pop(INSTANCE_DATA_JSON_KEY, None)
+    data = {
+        key: _decode_instance_value(value) for key, value in stored.items()
+    }
+    if json_data:
+        data.update(_decode_instance_value(json_data))
+    return data
+
+
+def _get_legacy_instance_attributes(
+    spec: Sdf.PrimSpec
+) -> list[Sdf.AttributeSpec]:
+    return [
+        attr_spec for attr_spec in spec.attributes
+        if attr_spec.name.startswith(INSTANCE_LEGACY_NAMESPACE)
+    ]
+
+
+def get_instances_data(stage: Usd.Stage) -> dict[Sdf.Path, dict]:
+    """Return the creator instance data per instance prim path.
+
+    Only the prim specs directly under `AYON_INSTANCES_ROOT` in the layers of
+    the stage's layer stack are read, so the cost is proportional to the
+    number of instances instead of the size of the stage. When multiple
+    layers hold data for the same instance, the strongest layer wins.
+
+    Arguments:
+        stage (Usd.Stage): The stage to get the instances from.
+
+    Returns:
+        dict[Sdf.Path, dict]: The instance data by instance prim path.
+
+    """
+    instance_ids = {AYON_INSTANCE_ID, AVALON_INSTANCE_ID}
+    instances: dict[Sdf.Path, dict] = {}
+    for spec in _iter_instance_specs(stage):
+        if spec.path in instances:
+            continue
+
+        data = read_instance_data(spec)
+        if data.get("id") not in instance_ids:
+            continue
+        instances[spec.path] = data
+
+    return instances
+
+
+def get_instance_spec(
+    stage: Usd.Stage,
+    path: Sdf.Path,
+    layers: Optional[list[Sdf.Layer]] = None
+) -> Optional[Sdf.PrimSpec]:
+    """Return the strongest prim spec holding instance data for `path`.
+
+    Arguments:
+        stage (Usd.Stage): The stage to search the layer stack of.
+        path (Sdf.Path): The instance prim path.
+        layers (Optional[list[Sdf.Layer]]): The layer stack of the stage,
+            to avoid computing it again when getting many instance specs.
+
+    Returns:
+        Optional[Sdf.PrimSpec]: The prim spec, if any layer holds the data.
+
+    """
+    if layers is None:
+        layers = get_layer_stack(
+            stage.GetRootLayer(), muted_layers=stage.GetMutedLayers()
+        )
+    for layer in layers:
+        spec = layer.GetPrimAtPath(path)
+        if spec and (
+            INSTANCE_DATA_KEY in spec.customData
+            or _get_legacy_instance_attributes(spec)
+        ):
+            return spec
+    return None
+
+
+def migrate_instances_data(stage: Usd.Stage, as_json: bool = False) -> int:
+    """Rewrite instance data stored in older layouts to the current one.
+
+    Arguments:
+        stage (Usd.Stage): The stage to migrate the instances of.
+        as_json (bool): Whether to store the data as a single JSON string.
+
+    Returns:
+        int: The number of instance prim specs that were migrated.
+
+    """
+    count = 0
+    with Sdf.ChangeBlock():
+        for spec in _iter_instance_specs(stage):
+            stored = spec.customData.get(INSTANCE_DATA_KEY)
+            if stored is not None and stored.get(
+                    INSTANCE_DATA_VERSION_KEY) == INSTANCE_DATA_VERSION:
+                continue
+
+            data = read_instance_data(spec)
+            if not data:
+                continue
+            write_instance_data(spec, data, as_json=as_json)
+            count += 1
+    return count
+
+
+def _iter_instance_specs(stage: Usd.Stage):
+    """Yield the instance prim specs of the layer stack, strongest first."""
+    layers = get_layer_stack(
+        stage.GetRootLayer(), muted_layers=stage.GetMutedLayers()
+    )
+    for layer in layers:
+        root_spec = layer.GetPrimAtPath(AYON_INSTANCES_ROOT)
+        if root_spec:
+            yield from root_spec.nameChildren
+
+
+def set_collection_includes(
+    spec: Sdf.PrimSpec,
+    paths: Iterable[Sdf.Path],
+    collection_name: str = INSTANCE_COLLECTION_NAME
+) -> Sdf.RelationshipSpec:
+    """Author the includes of a collection on a prim spec in one assignment.
+
+    Adding paths one by one through `Usd.CollectionAPI.IncludePath` edits
+    the relationship and notifies the stage for every path, which gets very
+    slow for large selections. Instead the targets are assigned as explicit
+    items of the `includes` relationship list op at once.
+
+    Arguments:
+        spec (Sdf.PrimSpec): The prim spec with the collection API applied.
+        paths (Iterable[Sdf.Path]): The paths to include.
+        collection_name (str): The name of the collection.
+
+    Returns:
+        Sdf.RelationshipSpec: The includes relationship spec.
+
+    """
+    name = f"collection:{collection_name}:includes"
+    relationship_spec = spec.relationships.get(name)
+    if relationship_spec is None:
+        relationship_spec = Sdf.RelationshipSpec(spec, name, custom=False)
+
+    # Remove duplicates, preserving order
+    targets = list(dict.fromkeys(Sdf.Path(path) for path in paths))
+    relationship_spec.targetPathList.explicitItems = targets
+    return relationship_spec
+
+
+def compute_membership_query(
+    prim: Usd.Prim,
+    collection_name: str = INSTANCE_COLLECTION_NAME
+) -> Usd.UsdCollectionMembershipQuery:
+    """Return the membership query of a collection on the prim.
+
+    Computing the query resolves the includes, excludes and any included
+    collections, so it should be computed once and reused for all
+    membership checks, e.g. with `query.IsPathIncluded(path)` or
+    `Usd.CollectionAPI.ComputeIncludedPaths(query, stage)`.
+
+    """
+    return Usd.CollectionAPI(prim, collection_name).ComputeMembershipQuery()
+
+
+def get_instance_membership_query(
+    instance
+) -> Optional[Usd.UsdCollectionMembershipQuery]:
+    """Return the cached membership query of a publish instance.
+
+    The query is computed on first request and cached in the instance
+    data so all publish plugins share it.
+
+    Arguments:
+        instance (pyblish.api.Instance): The publish instance.
+
+    Returns:
+        Optional[Usd.UsdCollectionMembershipQuery]: The membership query
+            of the instance collection, if the instance has a prim.
+
+    """
+    query = instance.data.get("membershipQuery")
+    if query is not None:
+        return query
+
+    stage: Usd.Stage = instance.context.data.get("stage")
+    instance_node = instance.data.get("instance_node")
+    if not stage or not instance_node:
+        return None
+
+    prim = stage.GetPrimAtPath(instance_node)
+    if not prim:
+        return None
+
+    query = compute_membership_query(prim)
+    instance.data["membershipQuery"] = query
+    return query
 
 
 def collect_animation_defs(create_context, fps=False):
@@ -46,7 +556,8 @@ def collect_animation_defs(create_context, fps=False):
 
     """
 
-    # use task entity attributes to set defaults based on current context
+    # use task entity attributes to set defaults based on current context,
+    # the create context caches the entity until the publisher is reset
     task_entity = create_context.get_current_task_entity()
     attrib: dict = task_entity["attrib"]
     frame_start: int = attrib["frameStart"]
@@ -93,19 +604,18 @@ def collect_animation_defs(create_context, fps=False):
 
 def get_main_window():
     """Get ShapeFX Loki Qt Main Window"""
-    app = opendcc.core.Application.instance()
-    return app.get_main_window()
+    return get_backend().get_main_window()
 
 
 @contextlib.contextmanager
 def maintained_selection():
     """Maintain selection during context."""
-    app = opendcc.core.Application.instance()
-    selection = app.get_selection()
+    backend = get_backend()
+    selection = backend.get_selection()
     try:
         yield
     finally:
-        opendcc.cmds.select(selection, replace=True)
+        backend.set_selection(selection)
 
 
 def reset_frame_range():
@@ -130,20 +640,202 @@ def reset_frame_range():
     stage.SetMetadata("maxTimeCode", Sdf.TimeCode(frame_end))
 
 
+@contextlib.contextmanager
+def count_stage_changes(stage: Optional[Usd.Stage]):
+    """Count the `Usd.Notice.ObjectsChanged` notices `stage` sends in context.
+
+    Each notice is sent after the stage processed a batch of changes, so
+    this is the number of recompositions triggered within the context.
+
+    Yields:
+        dict[str, int]: Dictionary whose `count` key holds the number of
+            notices sent so far.
+
+    """
+    counter = {"count": 0}
+    if stage is None:
+        yield counter
+        return
+
+    def _on_objects_changed(notice, sender):
+        counter["count"] += 1
+
+    listener = Tf.Notice.Register(
+        Usd.Notice.ObjectsChanged, _on_objects_changed, stage)
+    try:
+        yield counter
+    finally:
+        listener.Revoke()
+
+
+class SiblingNameIndex:
+    """Hand out unique child names under a parent prim.
+
+    The names of the existing children are read once, and the next free
+    number suffix is tracked per base name so getting a unique name does
+    not probe the stage for `name1`, `name2`, etc. Handed out names are
+    reserved, so names stay unique for prims that are not created yet.
+
+    """
+
+    def __init__(self, stage: Usd.Stage, parent_path: Sdf.Path):
+        self.stage = stage
+        self.parent_path = parent_path
+        self._used: set[str] = set()
+        self._next_suffix: dict[str, int] = {}
+
+        parent = stage.GetPrimAtPath(parent_path)
+        if parent:
+            for name in parent.GetAllChildrenNames():
+                self._reserve(name)
+
+    @staticmethod
+    def _split_suffix(name: str) -> tuple[str, Optional[int]]:
+        base = name.rstrip("0123456789")
+        digits = name[len(base):]
+        return base, int(digits) if digits else None
+
+    def _reserve(self, name: str):
+        self._used.add(name)
+        base, suffix = self._split_suffix(name)
+        if suffix is not None and suffix >= self._next_suffix.get(base, 1):
+            self._next_suffix[base] = suffix + 1
+
+    def _is_taken(self, name: str) -> bool:
+        # Also check the stage for prims created since the index was built
+        return name in self._used or bool(
+            self.stage.GetPrimAtPath(self.parent_path.AppendChild(name))
+        )
+
+    def unique_name(self, name: str) -> str:
+        """Return and reserve a unique child name for `name`."""
+        if self._is_taken(name):
+            base, _suffix = self._split_suffix(name)
+            suffix = self._next_suffix.get(base, 1)
+            while self._is_taken(f"{base}{suffix}"):
+                suffix += 1
+            name = f"{base}{suffix}"
+        self._reserve(name)
+        return name
+
+
+# Sibling name indices shared during a `sibling_name_batch`
+_SIBLING_NAME_INDICES: Optional[dict] = None
+
+
+def start_sibling_name_batch() -> bool:
+    """Start sharing sibling name indices until `end_sibling_name_batch`.
+
+    Returns:
+        bool: Whether a batch was started, False if one is active already.
+
+    """
+    global _SIBLING_NAME_INDICES
+    if _SIBLING_NAME_INDICES is not None:
+        return False
+    _SIBLING_NAME_INDICES = {}
+    return True
+
+
+def end_sibling_name_batch():
+    """End the active sibling name batch, if any."""
+    global _SIBLING_NAME_INDICES
+    _SIBLING_NAME_INDICES = None
+
+
+@contextlib.contextmanager
+def sibling_name_batch():
+    """Share sibling name indices between unique name requests.
+
+    Within the context `unique_path` and `unique_child_names` build the
+    index of a parent prim once and reuse it, so e.g. loading or creating
+    many products with the same name does not scan the siblings each time.
+    Nested batches share the outer batch.
+
+    """
+    if not start_sibling_name_batch():
+        yield
+        return
+
+    try:
+        yield
+    finally:
+        end_sibling_name_batch()
+
+
+def get_sibling_name_index(
+    stage: Usd.Stage,
+    parent_path: Sdf.Path
+) -> SiblingNameIndex:
+    """Return the sibling name index of the parent prim.
+
+    Inside a `sibling_name_batch` the index is shared, otherwise a new index
+    is built.
+
+    """
+    if _SIBLING_NAME_INDICES is None:
+        return SiblingNameIndex(stage, parent_path)
+
+    key = (stage, parent_path)
+    index = _SIBLING_NAME_INDICES.get(key)
+    if index is None:
+        index = SiblingNameIndex(stage, parent_path)
+        _SIBLING_NAME_INDICES[key] = index
+    return index
+
+
 def unique_path(stage: Usd.Stage, prim_path: Sdf.Path) -> Sdf.Path:
     """Return Sdf.Path that is unique under the current composed stage.
 
+    If the path exists the trailing digits of the name are replaced with
+    a free number suffix. Inside a `sibling_name_batch` that is the next
+    suffix after the highest one among the siblings, looked up from an
+    index shared by the batch.
+
     Note that this technically does not ensure that the Sdf.Path does not
     exist in any of the layers, e.g. it could be defined within a currently
     unselected variant or a muted layer.
 
     """
-    src = prim_path.pathString.rstrip("123456789")
-    i = 1
-    while stage.GetPrimAtPath(prim_path):
-        prim_path = Sdf.Path(f"{src}{i}")
-        i += 1
-    return prim_path
+    parent_path = prim_path.GetParentPath()
+    if _SIBLING_NAME_INDICES is not None:
+        index = get_sibling_name_index(stage, parent_path)
+        return parent_path.AppendChild(index.unique_name(prim_path.name))
+
+    # Outside a batch probe the few names needed instead of indexing all
+    # siblings, since the parent is often the pseudo-root of a big stage
+    if not stage.GetPrimAtPath(prim_path):
+        return prim_path
+
+    base = prim_path.name.rstrip("0123456789")
+    suffix = 1
+    while stage.GetPrimAtPath(parent_path.AppendChild(f"{base}{suffix}")):
+        suffix += 1
+    return parent_path.AppendChild(f"{base}{suffix}")
+
+
+def unique_child_names(
+    stage: Usd.Stage,
+    parent_path: Sdf.Path,
+    names: list[str]
+) -> list[str]:
+    """Return a unique name under the parent for each of the given names.
+
+    This is the bulk equivalent of `unique_path` for many children of the
+    same parent, with names that collide with an earlier name in the list
+    also getting a number suffix.
+
+    Arguments:
+        stage (Usd.Stage): The stage to check the existing children on.
+        parent_path (Sdf.Path): The path of the parent prim.
+        names (list[str]): The requested child names.
+
+    Returns:
+        list[str]: The unique child names, in order of `names`.
+
+    """
+    index = get_sibling_name_index(stage, parent_path)
+    return [index.unique_name(name) for name in names]
 
 
 def remove_prim(prim: Usd.Prim):
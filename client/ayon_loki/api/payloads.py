@@ -0,0 +1,204 @@
+"""Payload load rules stored in the workfile and background payload loading.
+
+The load rules of the stage are stored in the root layer's custom layer data
+when saving, so a workfile can be opened with the payloads loaded that were
+loaded when it was last saved. Opening without payloads and loading them
+afterwards with the `PayloadLoader` makes the workfile usable right away.
+"""
+import logging
+import time
+from collections import deque
+from typing import Optional
+
+from qtpy import QtCore
+from pxr import Sdf, Usd
+
+from .layer_data import get_layer_data_cache
+
+log = logging.getLogger(__name__)
+
+# Custom layer data key on the root layer to store the load rules in
+LOAD_RULES_KEY = "AYON_load_rules"
+
+_RULE_NAMES = {
+    Usd.StageLoadRules.AllRule: "all",
+    Usd.StageLoadRules.OnlyRule: "only",
+    Usd.StageLoadRules.NoneRule: "none",
+}
+_RULES_BY_NAME = {name: rule for rule, name in _RULE_NAMES.items()}
+
+
+def read_load_rules(layer: Sdf.Layer) -> Optional[Usd.StageLoadRules]:
+    """Return the load rules stored in the layer, if any."""
+    data = get_layer_data_cache().get(layer, LOAD_RULES_KEY)
+    if data is None:
+        return None
+
+    rules = Usd.StageLoadRules()
+    for path, name in data.items():
+        rule = _RULES_BY_NAME.get(name)
+        if rule is None:
+            log.warning(f"Ignoring unknown load rule '{name}' for {path}")
+            continue
+        rules.AddRule(Sdf.Path(path), rule)
+    return rules
+
+
+def write_load_rules(layer: Sdf.Layer, rules: Usd.StageLoadRules) -> bool:
+    """Store the load rules in the layer if they differ from the stored ones.
+
+    Returns:
+        bool: Whether the layer was changed.
+
+    """
+    data = {
+        path.pathString: _RULE_NAMES[rule]
+        for path, rule in rules.GetRules()
+    }
+    return get_layer_data_cache().set(layer, LOAD_RULES_KEY, data)
+
+
+class PayloadLoader(QtCore.QObject):
+    """Load the payloads of a stage in steps on the main thread's event loop.
+
+    Payloads are loaded top-down, breadth first, so the overall layout of
+    the scene is loaded before the details. Each payload is loaded without
+    its descendants, and the payloads revealed by loading it are queued
+    after it, so the target load rules are followed at every level. Only
+    `batch_size` payloads are loaded per step to keep the UI responsive.
+
+    """
+    progress = QtCore.Signal(int)  # number of loaded payloads
+    finished = QtCore.Signal()
+
+    def __init__(
+        self,
+        stage: Usd.Stage,
+        rules: Usd.StageLoadRules,
+        batch_size: int = 10,
+        start_time: Optional[float] = None
+    ):
+        super().__init__()
+        self.stage = stage
+        self.rules = rules
+        self.batch_size = max(1, batch_size)
+        self.start_time = start_time or time.perf_counter()
+        self.loaded = 0
+        self._queue: deque[Sdf.Path] = deque()
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._on_timeout)
+
+    def start(self):
+        root = self.stage.GetPseudoRoot()
+        self._queue.extend(self._get_payload_paths(root))
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+        self._queue.clear()
+
+    def is_running(self) -> bool:
+        return self._timer.isActive()
+
+    @staticmethod
+    def _get_payload_paths(root: Usd.Prim) -> list[Sdf.Path]:
+        """Return the topmost prims with payloads below `root`."""
+        paths = []
+        # Include unloaded prims, which the default predicate skips
+        predicate = (
+            Usd.PrimIsActive & Usd.PrimIsDefined & ~Usd.PrimIsAbstract
+        )
+        prim_range = iter(Usd.PrimRange(root, predicate))
+        next(prim_range)  # skip the root itself
+        for prim in prim_range:
+            if prim.HasPayload():
+                paths.append(prim.GetPath())
+                prim_range.PruneChildren()
+        return paths
+
+    def _on_timeout(self):
+        for _ in range(self.batch_size):
+            if not self._queue:
+                self._finish()
+                return
+
+            path = self._queue.popleft()
+            if self.rules.GetEffectiveRuleForPath(path) == (
+                Usd.StageLoadRules.NoneRule
+            ):
+                continue
+
+            prim = self.stage.Load(path, Usd.LoadWithoutDescendants)
+            if not prim:
+                continue
+            self.loaded += 1
+            self._queue.extend(self._get_payload_paths(prim))
+
+        self.progress.emit(self.loaded)
+
+    def _finish(self):
+        self._timer.stop()
+
+        # Make sure the stage matches the rules exactly, e.g. for payloads
+        # that were loaded already
+        self.stage.SetLoadRules(self.rules)
+        log.info(
+            f"Loaded {self.loaded} payloads in the background, fully "
+            f"loaded {time.perf_counter() - self.start_time:.3f}s after "
+            f"opening started."
+        )
+        self.finished.emit()
+
+
+_PAYLOAD_LOADER: Optional[PayloadLoader] = None
+
+
+def get_payload_loader() -> Optional[PayloadLoader]:
+    """Return the last started payload loader, if any."""
+    return _PAYLOAD_LOADER
+
+
+def load_payloads_in_background(
+    stage: Usd.Stage,
+    rules: Usd.StageLoadRules,
+    batch_size: int = 10,
+    start_time: Optional[float] = None
+) -> PayloadLoader:
+    """Start loading the payloads of the stage following `rules`.
+
+    Any payload loading still running for another stage is stopped.
+
+    """
+    global _PAYLOAD_LOADER
+    stop_payload_loader()
+
+    _PAYLOAD_LOADER = PayloadLoader(stage, rules, batch_size, start_time)
+    _PAYLOAD_LOADER.start()
+    return _PAYLOAD_LOADER
+
+
+def stop_payload_loader():
+    """Stop loading payloads in the background, if running.
+
+    This must be called before the current stage gets replaced, so the
+    loader doesn't keep loading payloads of a stage that is closed.
+
+    """
+    global _PAYLOAD_LOADER
+    if _PAYLOAD_LOADER is not None:
+        _PAYLOAD_LOADER.stop()
+        _PAYLOAD_LOADER = None
+
+
+def get_load_rules_to_store(stage: Usd.Stage) -> Usd.StageLoadRules:
+    """Return the load rules to store in the workfile for the stage.
+
+    While payloads are loaded in the background the target rules are
+    returned instead of the partially loaded state.
+
+    """
+    loader = _PAYLOAD_LOADER
+    if loader is not None and loader.stage == stage and loader.is_running():
+        return loader.rules
+    return stage.GetLoadRules()
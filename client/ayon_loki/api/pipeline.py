@@ -1,7 +1,6 @@
 import os
 import logging
 import contextlib
-from typing import Any
 
 import pyblish.api
 
@@ -9,24 +8,21 @@ from ayon_core.host import HostBase, IWorkfileHost, ILoadHost, IPublishHost
 from ayon_core.pipeline import (
     register_loader_plugin_path,
     register_creator_plugin_path,
+    register_inventory_action_path,
     AYON_CONTAINER_ID,
     get_current_context,
 )
-from ayon_core.tools.utils import host_tools
-
-from .workio import (
-    open_file,
-    save_file,
-    file_extensions,
-    has_unsaved_changes,
-    current_file
-)
 import ayon_loki
 
 from qtpy import QtCore
-from pxr import Sdf, Usd
+from pxr import Usd
 
 from . import lib
+from .backends import get_backend
+
+# The workfile IO, container index, tools and settings are imported where
+# they are used, so installing the host at Loki launch doesn't import them
+# before they are needed
 
 log = logging.getLogger("ayon_loki")
 
@@ -61,6 +57,8 @@ def get_current_context_label() -> str:
 
 
 def install_menu():
+    from .tools import get_prewarm_tool_names, prewarm_tools, show_tool
+
     main_window = lib.get_main_window()
     menubar = main_window.menuBar()
 
@@ -78,35 +76,26 @@ def install_menu():
     menu.addSection("Tools")
     menu.addAction(
         "Create...",
-        lambda: host_tools.show_publisher(
-            parent=main_window,
-            tab="create"
-        )
+        lambda: show_tool("publisher", parent=main_window, tab="create")
     )
     menu.addAction(
         "Load...",
-        lambda: host_tools.show_loader(
-            parent=main_window,
-            use_context=True
-        )
+        lambda: show_tool("loader", parent=main_window, use_context=True)
     )
     menu.addAction(
         "Manage...",
-        lambda: host_tools.show_scene_inventory(parent=main_window)
+        lambda: show_tool("scene_inventory", parent=main_window)
     )
     menu.addAction(
         "Publish...",
-        lambda: host_tools.show_publisher(
-            parent=main_window,
-            tab="publish"
-        )
+        lambda: show_tool("publisher", parent=main_window, tab="publish")
     )
 
     # Workfiles
     menu.addSection("Workfiles")
     menu.addAction(
         "Workfiles",
-        lambda: host_tools.show_workfiles(parent=main_window)
+        lambda: show_tool("workfiles", parent=main_window)
     )
     menu.addAction("Set Frame Range", lib.reset_frame_range)
     # menu.addAction("Set Colorspace")  # TODO: Implement
@@ -114,9 +103,12 @@ def install_menu():
     menu.addSection("Experimental")
     menu.addAction(
         "Experimental Tools...",
-        lambda: host_tools.show_experimental_tools_dialog(parent=main_window)
+        lambda: show_tool("experimental_tools_dialog", parent=main_window)
     )
 
+    # Build the tools now so opening them from the menu is fast
+    prewarm_tools(get_prewarm_tool_names(), parent=main_window)
+
 
 class LokiHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
     name = "loki"
@@ -134,24 +126,35 @@ class LokiHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
 
         register_loader_plugin_path(LOAD_PATH)
         register_creator_plugin_path(CREATE_PATH)
-        # TODO: Register only when any inventory actions are created
-        # register_inventory_action_path(INVENTORY_PATH)
 
-        defer(install_menu)
+        # Start tracking dirty layers for `has_unsaved_changes`
+        from .dirty_layers import get_dirty_layer_tracker
+        get_dirty_layer_tracker().register()
+
+        register_inventory_action_path(INVENTORY_PATH)
+
+        # There is no UI to install the menu into without an event loop
+        if get_backend().interactive:
+            defer(install_menu)
 
     def open_workfile(self, filepath):
+        from .workio import open_file
         return open_file(filepath)
 
     def save_workfile(self, filepath=None):
-        return save_file(filepath)
+        from .workio import is_background_save_enabled, save_file
+        return save_file(filepath, background=is_background_save_enabled())
 
     def get_current_workfile(self):
+        from .workio import current_file
         return current_file()
 
     def workfile_has_unsaved_changes(self):
+        from .workio import has_unsaved_changes
         return has_unsaved_changes()
 
     def get_workfile_extensions(self):
+        from .workio import file_extensions
         return file_extensions()
 
     def get_containers(self):
@@ -170,78 +173,54 @@ class LokiHost(HostBase, IWorkfileHost, ILoadHost, IPublishHost):
         if not stage:
             return
 
-        root_layer = stage.GetRootLayer()
-        layer_data = root_layer.customLayerData
-        layer_data[AYON_CONTEXT_DATA_KEY] = data
-        root_layer.customLayerData = layer_data
+        from .layer_data import get_layer_data_cache
+        get_layer_data_cache().set(
+            stage.GetRootLayer(), AYON_CONTEXT_DATA_KEY, data
+        )
 
     def get_context_data(self):
         stage = lib.get_current_stage()
         if not stage:
             return {}
 
-        root_layer = stage.GetRootLayer()
-        return root_layer.customLayerData.get(AYON_CONTEXT_DATA_KEY, {})
+        from .layer_data import get_layer_data_cache
+        return get_layer_data_cache().get(
+            stage.GetRootLayer(), AYON_CONTEXT_DATA_KEY, {}
+        )
 
 
-def iter_containers():
+def iter_containers(loader=None, representation_ids=None, layers=None):
     """Yield all objects in the active document that have 'id' attribute set
-    matching an AYON container ID"""
-
-    stage = lib.get_current_stage()
-    if not stage:
-        return
-
-    # Iterate all "local scene layers" which we'll consider to be the root
-    # layer and any sublayers. We do not traverse into references or payloads
-    # assuming they are completely external.
-    root_layer = stage.GetRootLayer()
-    layers: list[Sdf.Layer] = [root_layer] + list(root_layer.subLayerPaths)
-    for layer in layers:
-        containers: list[dict[str, Any]] = []
-
-        def _collect_containers(path: Sdf.Path):
-            spec = layer.GetObjectAtPath(path)
-
-            # Check for AYON metadata on property specs
-            if isinstance(spec, Sdf.PropertySpec):
-                data = spec.customData.get("AYON", {})
-                if data.get("id") != AYON_CONTAINER_ID:
-                    return
-
-                spec_container = data
-                spec_container["spec"] = spec
-
-                # TODO: Are these required values?
-                spec_container["objectName"] = spec.name
-                spec_container["namespace"] = path.pathString
-                spec_container["name"] = layer.identifier
+    matching an AYON container ID
 
-                containers.append(spec_container)
+    The containers are yielded lazily, so filtering here instead of on the
+    result avoids scanning layers that are excluded or not needed anymore,
+    e.g. when only the first match is of interest:
 
-            if isinstance(spec, Sdf.PrimSpec):
-                # Query references for potential containers from their metadata
+        >>> container = next(iter_containers(loader="ReferenceLoader"), None)
 
-                for key in lib.USD_LIST_ATTRS:
-                    for ref in getattr(spec.referenceList, key):
-                        data = ref.customData.get("AYON", {})
-                        if data.get("id") != AYON_CONTAINER_ID:
-                            continue
+    Arguments:
+        loader (Optional[Union[str, type]]): Only yield containers loaded
+            by this loader, by class or class name.
+        representation_ids (Optional[Iterable[str]]): Only yield containers
+            of these representation ids.
+        layers (Optional[Iterable[Union[str, Sdf.Layer]]]): Only yield
+            containers from these layers, by layer or layer identifier.
 
-                        spec_container = data
-                        spec_container["spec"] = spec
-                        spec_container["reference"] = ref
+    """
 
-                        # TODO: Are these required values?
-                        spec_container["objectName"] = spec.name
-                        spec_container["namespace"] = path.pathString
-                        spec_container["name"] = layer.identifier
+    from .containers import get_container_index
 
-                        containers.append(spec_container)
+    stage = lib.get_current_stage()
+    if not stage:
+        return
 
-        layer.Traverse("/", _collect_containers)
-        for container in containers:
-            yield container
+    yield from get_container_index().iter_containers(
+        stage,
+        loader=loader,
+        representation_ids=representation_ids,
+        layers=layers
+    )
 
 
 def containerise(name,
@@ -1,27 +1,47 @@
 """Loki specific plugin definitions."""
+import time
 from abc import (
     ABCMeta
 )
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Optional
+
 import six
 
 import pyblish.api
 
 from ayon_core.pipeline import (
+    Anatomy,
     CreatorError,
     Creator,
     CreatedInstance,
-    AYON_INSTANCE_ID,
-    AVALON_INSTANCE_ID,
     load,
     publish
 )
-from ayon_core.lib import BoolDef
-
-from .lib import get_current_stage
-# from .lib import imprint, read, lsattr
+from ayon_core.lib import BoolDef, get_local_site_id
+
+from .backends import get_backend
+from .lib import (
+    AYON_INSTANCES_ROOT,
+    INSTANCE_COLLECTION_NAME,
+    get_current_stage,
+    count_stage_changes,
+    end_sibling_name_batch,
+    get_instance_spec,
+    get_instances_data,
+    get_layer_stack,
+    read_instance_data,
+    set_collection_includes,
+    sibling_name_batch,
+    start_sibling_name_batch,
+    unique_child_names,
+    unique_path,
+    update_instance_data,
+    write_instance_data
+)
 
-import opendcc.core
-from pxr import Usd
+from qtpy import QtCore
+from pxr import Sdf, Usd
 
 
 SETTINGS_CATEGORY = "loki"
@@ -34,7 +54,8 @@ class LokiCreatorBase(object):
 
         Create `loki_cached_instances` key when needed in shared data and
         fill it with all collected instances from the scene under its
-        respective creator identifiers.
+        respective creator identifiers. Each instance is cached as a tuple
+        of its prim path and its instance data.
 
         Args:
             Dict[str, Any]: Shared data.
@@ -42,16 +63,13 @@ class LokiCreatorBase(object):
         """
         if shared_data.get("loki_cached_instances") is None:
             cache = dict()
-            nodes = []
-            for id_type in [AYON_INSTANCE_ID, AVALON_INSTANCE_ID]:
-                nodes.extend(lsattr("id", id_type))
-            for node in nodes:
-
-                creator_identifier_parm = node.parm("creator_identifier")
-                if creator_identifier_parm:
-                    # creator instance
-                    creator_id = creator_identifier_parm.eval()
-                    cache.setdefault(creator_id, []).append(node)
+            stage = get_current_stage()
+            if stage:
+                instances = get_instances_data(stage)
+                for path, data in instances.items():
+                    creator_id = data.get("creator_identifier")
+                    if creator_id:
+                        cache.setdefault(creator_id, []).append((path, data))
 
             shared_data["loki_cached_instances"] = cache
 
@@ -79,14 +97,58 @@ class LokiCreatorBase(object):
         if not stage:
             raise CreatorError("No current stage found.")
 
-        # Define parent as scope if not exists
-        if not stage.GetPrimAtPath("/AYON_Instances"):
-            stage.DefinePrim("/AYON_Instances", "Scope")
+        spec = LokiCreatorBase.create_instance_specs(stage, [product_name])[0]
+        return stage.GetPrimAtPath(spec.path)
+
+    @staticmethod
+    def create_instance_specs(
+        stage: Usd.Stage,
+        product_names: list[str]
+    ) -> list[Sdf.PrimSpec]:
+        """Author instance prim specs in the edit target in one change.
+
+        Each instance is defined as a uniquely named `Scope` under the
+        instances root with a USD Collection API applied. The specs are
+        authored directly in the edit target layer so that creating any
+        number of instances recomposes the stage only once.
+
+        Arguments:
+            stage (Usd.Stage): The stage to create the instances in.
+            product_names (list[str]): The product name per instance.
 
-        # TODO: Define unique name for the instance
-        prim = stage.DefinePrim(f"/AYON_Instances/{product_name}", "Scope")
-        Usd.CollectionAPI.Apply(prim)
-        return prim
+        Returns:
+            list[Sdf.PrimSpec]: The created prim spec per product name.
+
+        """
+        names = unique_child_names(stage, AYON_INSTANCES_ROOT, product_names)
+        edit_target = stage.GetEditTarget()
+        layer = edit_target.GetLayer()
+        api_schemas = Sdf.TokenListOp.Create(
+            prependedItems=[f"CollectionAPI:{INSTANCE_COLLECTION_NAME}"]
+        )
+
+        specs = []
+        with Sdf.ChangeBlock():
+            # Define parent as scope if not exists
+            if not stage.GetPrimAtPath(AYON_INSTANCES_ROOT):
+                root_spec = Sdf.CreatePrimInLayer(
+                    layer, edit_target.MapToSpecPath(AYON_INSTANCES_ROOT)
+                )
+                root_spec.specifier = Sdf.SpecifierDef
+                root_spec.typeName = "Scope"
+
+            for name in names:
+                spec = Sdf.CreatePrimInLayer(
+                    layer,
+                    edit_target.MapToSpecPath(
+                        AYON_INSTANCES_ROOT.AppendChild(name)
+                    )
+                )
+                spec.specifier = Sdf.SpecifierDef
+                spec.typeName = "Scope"
+                spec.SetInfo("apiSchemas", api_schemas)
+                specs.append(spec)
+        return specs
 
 
 @six.add_metaclass(ABCMeta)
@@ -94,48 +156,115 @@ class LokiCreator(Creator, LokiCreatorBase):
     """Base class for most of the Loki creator plugins."""
     settings_category = SETTINGS_CATEGORY
 
+    # Store the instance data as a single JSON string instead of a
+    # dictionary of values on the instance prim
+    store_instance_data_as_json = False
+
+    # Instance data keys that are derived on collection and never stored
+    skip_imprint_keys = {"instance_node", "instance_id", "families"}
+
     def create(self, product_name, instance_data, pre_create_data):
+        return self.create_instances(
+            [(product_name, instance_data)], pre_create_data
+        )[0]
 
-        # Convert use selection into selection pre_create_data
-        if pre_create_data.get("use_selection"):
-            app = opendcc.core.Application.instance()
-            pre_create_data["selection"] = app.get_selection()
+    def create_instances(
+        self,
+        items: list[tuple[str, dict[str, Any]]],
+        pre_create_data: dict[str, Any],
+        includes: Optional[list[Iterable[Sdf.Path]]] = None
+    ) -> list[CreatedInstance]:
+        """Create many instances at once with a single stage recomposition.
 
-        # Create prim
-        instance_node = self.create_instance_node(
-            instance_data["folderPath"],
-            product_name,
-            pre_create_data
-        )
+        The instance prims and their instance data are authored directly in
+        the edit target layer inside one `Sdf.ChangeBlock`.
 
-        # Define instance
-        instance_data["instance_node"] = instance_node.path()
-        instance_data["instance_id"] = instance_node.path()
-        instance_data["families"] = self.get_publish_families()
-        instance = CreatedInstance(
-            self.product_type,
-            product_name,
-            instance_data,
-            self)
-        self._add_instance_to_context(instance)
+        Arguments:
+            items (list[tuple[str, dict[str, Any]]]): The product name and
+                instance data per instance to create.
+            pre_create_data (dict[str, Any]): Pre create data shared by all
+                instances.
+            includes (Optional[list[Iterable[Sdf.Path]]]): The paths to
+                include in the collection per instance, in order of `items`.
+                Without it every instance includes the selection of the
+                pre create data.
 
-        # Imprint instance data to the prim
-        self.imprint(instance_node, instance.data_to_store())
+        Returns:
+            list[CreatedInstance]: The created instances, in order of
+                `items`.
 
-        return instance
+        """
+        stage = get_current_stage()
+        if not stage:
+            raise CreatorError("No current stage found.")
+
+        if includes is None:
+            # Convert use selection into selection pre_create_data
+            if pre_create_data.get("use_selection"):
+                pre_create_data["selection"] = (
+                    get_backend().get_selected_paths()
+                )
+            selected_paths = pre_create_data.get("selection") or []
+            includes = [selected_paths] * len(items)
+        elif len(includes) != len(items):
+            raise CreatorError(
+                f"Got {len(includes)} includes for {len(items)} instances."
+            )
+
+        start = time.perf_counter()
+        instances = []
+        with count_stage_changes(stage) as stage_changes:
+            with sibling_name_batch(), Sdf.ChangeBlock():
+                specs = self.create_instance_specs(
+                    stage, [product_name for product_name, _ in items]
+                )
+                for (product_name, instance_data), spec, paths in zip(
+                    items, specs, includes
+                ):
+                    # Define instance
+                    path = AYON_INSTANCES_ROOT.AppendChild(spec.name)
+                    instance_data["instance_node"] = path.pathString
+                    instance_data["instance_id"] = path.pathString
+                    instance_data["families"] = self.get_publish_families()
+                    instance = CreatedInstance(
+                        self.product_type,
+                        product_name,
+                        instance_data,
+                        self)
+                    self._add_instance_to_context(instance)
+
+                    # Include the members in the instance collection
+                    if paths:
+                        set_collection_includes(spec, paths)
+
+                    # Imprint instance data to the prim spec
+                    values = instance.data_to_store()
+                    for key in self.skip_imprint_keys:
+                        values.pop(key, None)
+                    write_instance_data(
+                        spec, values, as_json=self.store_instance_data_as_json
+                    )
+                    instances.append(instance)
+
+        self.log.debug(
+            f"Created {len(instances)} instances in "
+            f"{time.perf_counter() - start:.3f}s with "
+            f"{stage_changes['count']} stage recomposition(s)."
+        )
+        return instances
 
     def collect_instances(self):
         # cache instances  if missing
         self.cache_instance_data(self.collection_shared_data)
-        for instance in self.collection_shared_data[
+        for path, data in self.collection_shared_data[
                 "loki_cached_instances"].get(self.identifier, []):
 
-            node_data = read(instance)
+            node_data = dict(data)
 
-            # Node paths are always the full node path since that is unique
-            # Because it's the node's path it's not written into attributes
+            # Prim paths are always the full path since that is unique
+            # Because it's the prim's path it's not written into the data
             # but explicitly collected
-            node_path = instance.path()
+            node_path = path.pathString
             node_data["instance_id"] = node_path
             node_data["instance_node"] = node_path
             node_data["families"] = self.get_publish_families()
@@ -146,26 +275,80 @@ class LokiCreator(Creator, LokiCreatorBase):
             self._add_instance_to_context(created_instance)
 
     def update_instances(self, update_list):
-        for created_inst, changes in update_list:
-            instance_node = hou.node(created_inst.get("instance_node"))
-            new_values = {
-                key: changes[key].new_value
-                for key in changes.changed_keys
-            }
-            # Update parm templates and values
-            self.imprint(
-                instance_node,
-                new_values,
-                update=True
-            )
+        stage = get_current_stage()
+        if not stage:
+            return
+
+        # Write only the changed keys, directly to the specs, so that saving
+        # any number of instances triggers a single recomposition
+        start = time.perf_counter()
+        layers = get_layer_stack(
+            stage.GetRootLayer(), muted_layers=stage.GetMutedLayers()
+        )
+        with count_stage_changes(stage) as stage_changes:
+            with Sdf.ChangeBlock():
+                for created_inst, changes in update_list:
+                    path = Sdf.Path(created_inst.get("instance_node"))
+                    spec = self._get_instance_spec(stage, path, layers)
+
+                    new_data = created_inst.data_to_store()
+                    values = {}
+                    removed_keys = []
+                    for key in changes.changed_keys:
+                        if key in self.skip_imprint_keys:
+                            continue
+                        if key in new_data:
+                            values[key] = new_data[key]
+                        else:
+                            removed_keys.append(key)
+
+                    update_instance_data(
+                        spec,
+                        values,
+                        removed_keys,
+                        as_json=self.store_instance_data_as_json
+                    )
+
+        self.log.debug(
+            f"Updated {len(update_list)} instances in "
+            f"{time.perf_counter() - start:.3f}s with "
+            f"{stage_changes['count']} stage recomposition(s)."
+        )
 
     def imprint(self, node, values, update=False):
         # Never store instance node and instance id since that data comes
         # from the node's path
-        values.pop("instance_node", None)
-        values.pop("instance_id", None)
-        values.pop("families", None)
-        imprint(node, values, update=update)
+        for key in self.skip_imprint_keys:
+            values.pop(key, None)
+
+        spec = self._get_instance_spec(node.GetStage(), node.GetPath())
+        if update:
+            values = {**read_instance_data(spec), **values}
+        write_instance_data(
+            spec, values, as_json=self.store_instance_data_as_json
+        )
+
+    @staticmethod
+    def _get_instance_spec(
+        stage: Usd.Stage,
+        path: Sdf.Path,
+        layers: Optional[list[Sdf.Layer]] = None
+    ) -> Sdf.PrimSpec:
+        """Return the prim spec to store the instance data on.
+
+        This is the strongest spec in the layer stack already holding data
+        for the instance, or otherwise the spec in the current edit target.
+
+        """
+        spec = get_instance_spec(stage, path, layers)
+        if spec is None:
+            edit_target = stage.GetEditTarget()
+            spec = edit_target.GetPrimSpecForScenePath(path)
+            if spec is None:
+                spec = Sdf.CreatePrimInLayer(
+                    edit_target.GetLayer(), edit_target.MapToSpecPath(path)
+                )
+        return spec
 
     def remove_instances(self, instances):
         """Remove specified instance from the scene.
@@ -206,12 +389,224 @@ class LokiCreator(Creator, LokiCreatorBase):
         return []
 
 
+class FilepathCache(object):
+    """Least recently used cache of resolved paths with a time to live.
+
+    Each value is stored with a fingerprint. A lookup with a different
+    fingerprint, e.g. because the project anatomy was updated, is a miss.
+
+    Arguments:
+        max_size (int): Maximum number of cached paths.
+        ttl (float): Seconds after which a cached path is resolved again.
+
+    """
+
+    def __init__(self, max_size: int = 4096, ttl: float = 60.0):
+        self.max_size: int = max_size
+        self.ttl: float = ttl
+        self.hits: int = 0
+        self.misses: int = 0
+        self._items: OrderedDict[
+            Hashable, tuple[float, Hashable, str]] = OrderedDict()
+
+    def get(self, key: Hashable, fingerprint: Hashable) -> Optional[str]:
+        item = self._items.get(key)
+        if item is not None:
+            expires, item_fingerprint, value = item
+            if item_fingerprint == fingerprint and expires > time.monotonic():
+                self._items.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._items[key]
+
+        self.misses += 1
+        return None
+
+    def set(self, key: Hashable, fingerprint: Hashable, value: str):
+        self._items[key] = (time.monotonic() + self.ttl, fingerprint, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def clear(self, project_name: Optional[str] = None):
+        """Clear all cached paths or only those of the given project."""
+        if project_name is None:
+            self._items.clear()
+            return
+
+        for key in [key for key in self._items if key[0] == project_name]:
+            del self._items[key]
+
+
 class LokiLoader(load.LoaderPlugin):
     """Base class for Loki load plugins."""
 
     hosts = ["loki"]
     settings_category = SETTINGS_CATEGORY
 
+    # Resolved representation paths shared by all Loki loaders, so bulk
+    # loading or updating the same representation resolves its path once.
+    filepath_cache = FilepathCache()
+
+    # Root values by project name and site id, with their expiry time and
+    # the project `updatedAt` they were resolved for
+    _roots_fingerprints: dict[tuple[str, str], tuple[float, Any, tuple]] = {}
+
+    @classmethod
+    def filepath_from_context(cls, context):
+        """Return the cached path of the representation in the context.
+
+        The cache is keyed by project name and representation id. Updating
+        the project, like its anatomy, or the representation invalidates the
+        cached path. So does changing the active site or the root overrides
+        of the site, since the roots the path is resolved with are part of
+        the fingerprint.
+
+        """
+        project = context["project"]
+        representation = context["representation"]
+        key = (project["name"], representation["id"])
+        site_id = get_local_site_id()
+        fingerprint = (
+            project.get("updatedAt"),
+            representation.get("updatedAt"),
+            site_id,
+            cls._get_roots_fingerprint(project, site_id),
+        )
+
+        filepath = cls.filepath_cache.get(key, fingerprint)
+        if filepath is None:
+            filepath = super().filepath_from_context(context)
+            cls.filepath_cache.set(key, fingerprint, filepath)
+        return filepath
+
+    @classmethod
+    def _get_roots_fingerprint(
+        cls,
+        project: dict[str, Any],
+        site_id: str
+    ) -> tuple:
+        """Return the project's root values resolved for the site.
+
+        Building the `Anatomy` queries the root overrides of the site, so the
+        roots are only resolved again once the project is updated or after
+        the time to live of the path cache.
+
+        """
+        key = (project["name"], site_id)
+        updated_at = project.get("updatedAt")
+        now = time.monotonic()
+        item = cls._roots_fingerprints.get(key)
+        if item is not None:
+            expires, item_updated_at, roots = item
+            if item_updated_at == updated_at and expires > now:
+                return roots
+
+        anatomy = Anatomy(project["name"], project_entity=project)
+        roots = tuple(sorted(
+            (name, str(root)) for name, root in anatomy.roots.items()
+        ))
+        cls._roots_fingerprints[key] = (
+            now + cls.filepath_cache.ttl, updated_at, roots
+        )
+        return roots
+
+    def load_batch(
+        self,
+        contexts: list[dict[str, Any]],
+        name=None,
+        namespace=None,
+        options=None
+    ) -> list:
+        """Load many representations sharing the unique name lookups.
+
+        The prim names of all loads are made unique against one index of
+        their siblings instead of scanning the siblings for every load.
+
+        Arguments:
+            contexts (list[dict[str, Any]]): The representation contexts.
+
+        Returns:
+            list: The results of `load` per context.
+
+        """
+        with sibling_name_batch():
+            return [
+                self.load(context, name, namespace, options)
+                for context in contexts
+            ]
+
+    @staticmethod
+    def unique_path(stage: Usd.Stage, prim_path: Sdf.Path) -> Sdf.Path:
+        """Return a unique path for a prim to load, see `lib.unique_path`.
+
+        The loader tool loads each selected representation with a new
+        loader instance, one after another, without returning to the event
+        loop in between. The first load therefore starts a sibling name
+        batch that ends once the application is idle again, so all loads
+        of a multi-selection share one sibling name index.
+
+        """
+        if get_backend().interactive and start_sibling_name_batch():
+            QtCore.QTimer.singleShot(0, end_sibling_name_batch)
+        return unique_path(stage, prim_path)
+
+    def update(self, container, context):
+        self.update_batch([(container, context)])
+
+    def update_batch(
+        self,
+        items: list[tuple[dict[str, Any], dict[str, Any]]]
+    ):
+        """Update many containers with a single stage recomposition.
+
+        The containers are grouped by the spec they are authored on and all
+        edits are made inside one `Sdf.ChangeBlock`, so updating hundreds of
+        containers recomposes the stage once instead of once per container.
+
+        Arguments:
+            items (list[tuple[dict[str, Any], dict[str, Any]]]): Pairs of
+                container and the representation context to update it to.
+
+        """
+        specs: dict[tuple[str, Sdf.Path], tuple[Sdf.Spec, list]] = {}
+        for container, context in items:
+            spec = container["spec"]
+            key = (spec.layer.identifier, spec.path)
+            specs.setdefault(key, (spec, []))[1].append((container, context))
+
+        start = time.perf_counter()
+        with count_stage_changes(get_current_stage()) as changes:
+            with Sdf.ChangeBlock():
+                for spec, spec_items in specs.values():
+                    self.update_spec(spec, spec_items)
+
+        self.log.debug(
+            f"Updated {len(items)} containers on {len(specs)} specs in "
+            f"{time.perf_counter() - start:.3f}s with {changes['count']} "
+            f"stage recomposition(s)."
+        )
+
+    def update_spec(
+        self,
+        spec: Sdf.Spec,
+        items: list[tuple[dict[str, Any], dict[str, Any]]]
+    ):
+        """Update the containers authored on a single spec.
+
+        This is called from within an `Sdf.ChangeBlock` so implementations
+        must only edit specs and not use any `Usd` API.
+
+        Arguments:
+            spec (Sdf.Spec): The spec the containers are authored on.
+            items (list[tuple[dict[str, Any], dict[str, Any]]]): Pairs of
+                container and the representation context to update it to.
+
+        """
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not support updating."
+        )
+
 
 class LokiInstancePlugin(pyblish.api.InstancePlugin):
     """Base class for Loki instance publish plugins."""
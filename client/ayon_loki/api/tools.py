@@ -0,0 +1,132 @@
+"""Show and pre-warm the AYON tool windows.
+
+The AYON tools are imported on first use instead of at Loki startup, because
+importing them imports all of their widgets. The tool windows are created
+once by `host_tools` and kept alive, including their models, so only the
+first open of a tool builds it. Tools listed in the `tools/prewarm` settings
+are built after startup while the application is idle, so that even the
+first open from the menu only has to show the window.
+"""
+import logging
+import time
+from collections import deque
+from typing import Any, Optional
+
+from ayon_core.settings import get_current_project_settings
+
+from qtpy import QtCore
+
+log = logging.getLogger(__name__)
+
+# Tool name of `show_tool` to the tool name of `host_tools.get_tool_by_name`
+TOOL_NAMES = {
+    "publisher": "publisher",
+    "loader": "loader",
+    "scene_inventory": "sceneinventory",
+    "workfiles": "workfiles",
+    "experimental_tools_dialog": "experimental_tools",
+}
+
+
+def get_prewarm_tool_names() -> list[str]:
+    """Return the names of the tools to build while the application idles."""
+    project_settings = get_current_project_settings()
+    tools_settings = project_settings["loki"].get("tools", {})
+    return list(tools_settings.get("prewarm", []))
+
+
+class FirstPaintTimer(QtCore.QObject):
+    """Log the time from showing a tool until its window is first painted."""
+
+    def __init__(self, tool_name: str, window: QtCore.QObject):
+        super().__init__(window)
+        self.tool_name = tool_name
+        self.start_time = time.perf_counter()
+        window.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.Paint:
+            obj.removeEventFilter(self)
+            log.info(
+                f"Painted tool '{self.tool_name}' "
+                f"{time.perf_counter() - self.start_time:.3f}s after show."
+            )
+            self.deleteLater()
+        return False
+
+
+def get_tool(tool_name: str, parent: Optional[Any] = None) -> Any:
+    """Return the tool window, building it on first use."""
+    from ayon_core.tools.utils import host_tools
+
+    return host_tools.get_tool_by_name(TOOL_NAMES[tool_name], parent=parent)
+
+
+def show_tool(tool_name: str, **kwargs):
+    """Show the AYON tool, e.g. `show_tool("loader", parent=main_window)`."""
+    from ayon_core.tools.utils import host_tools
+
+    window = get_tool(tool_name, parent=kwargs.get("parent"))
+    FirstPaintTimer(tool_name, window)
+    return getattr(host_tools, f"show_{tool_name}")(**kwargs)
+
+
+class ToolPrewarmer(QtCore.QObject):
+    """Build tool windows one by one whenever the event loop is idle.
+
+    A zero interval timer only fires once there are no other events to
+    process, so building the tools doesn't delay showing the application.
+
+    """
+    def __init__(self, tool_names: list[str], parent: Optional[Any] = None):
+        super().__init__()
+        self.parent_window = parent
+        self._queue: deque[str] = deque(tool_names)
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._on_timeout)
+
+    def start(self):
+        self._timer.start()
+
+    def _on_timeout(self):
+        if not self._queue:
+            self._timer.stop()
+            return
+
+        tool_name = self._queue.popleft()
+        if tool_name not in TOOL_NAMES:
+            log.warning(f"Unable to pre-warm unknown tool: {tool_name}")
+            return
+
+        start = time.perf_counter()
+        try:
+            get_tool(tool_name, parent=self.parent_window)
+        except Exception:
+            log.warning(f"Failed to pre-warm tool: {tool_name}", exc_info=True)
+            return
+        log.info(
+            f"Pre-warmed tool '{tool_name}' in "
+            f"{time.perf_counter() - start:.3f}s"
+        )
+
+
+_TOOL_PREWARMER: Optional[ToolPrewarmer] = None
+
+
+def prewarm_tools(tool_names: list[str], parent: Optional[Any] = None):
+    """Build the tool windows in the background while the application idles.
+
+    Arguments:
+        tool_names (list[str]): Names of the tools to build, as accepted
+            by `show_tool`.
+        parent (Optional[Any]): The parent window of the tools, which must
+            be the same parent the tools are shown with.
+
+    """
+    global _TOOL_PREWARMER
+    if not tool_names:
+        return
+
+    _TOOL_PREWARMER = ToolPrewarmer(tool_names, parent)
+    _TOOL_PREWARMER.start()
@@ -0,0 +1,255 @@
+"""Read the grid descriptors of OpenVDB files without `pyopenvdb`.
+
+Only the file header, the grid descriptors and the grid metadata are read.
+The file is memory mapped so the (potentially huge) voxel data is never
+loaded, only the pages holding the header bytes are touched.
+"""
+import logging
+import mmap
+import os
+import struct
+from functools import lru_cache
+from typing import Any, Optional
+
+log = logging.getLogger(__name__)
+
+VDB_MAGIC = 0x56444220
+
+# OpenVDB file format versions at which the header layout changed
+FILE_VERSION_LIBRARY_VERSION = 211
+FILE_VERSION_GRID_OFFSETS = 212
+FILE_VERSION_GRID_INSTANCING = 216
+FILE_VERSION_BOOST_UUID = 218
+FILE_VERSION_SELECTIVE_COMPRESSION = 220
+FILE_VERSION_NODE_MASK_COMPRESSION = 222
+
+# Separator between grid name and index in unique grid names
+GRID_NAME_SEPARATOR = "\x1e"
+HALF_FLOAT_TYPENAME_SUFFIX = "_HalfFloat"
+
+# OpenVDB grid value type to `UsdVol.OpenVDBAsset` fieldDataType
+FIELD_DATA_TYPES = {
+    "bool": "bool",
+    "mask": "mask",
+    "half": "half",
+    "float": "float",
+    "double": "double",
+    "int32": "int",
+    "uint32": "uint",
+    "int64": "int64",
+    "string": "string",
+    "vec2s": "float2",
+    "vec2d": "double2",
+    "vec2i": "int2",
+    "vec3s": "float3",
+    "vec3d": "double3",
+    "vec3i": "int3",
+    "mat3d": "matrix3d",
+    "mat4d": "matrix4d",
+    "quatd": "quatd",
+}
+
+# OpenVDB grid class metadata to `UsdVol.OpenVDBAsset` fieldClass
+FIELD_CLASSES = {
+    "level set": "levelSet",
+    "fog volume": "fogVolume",
+    "staggered": "staggered",
+    "unknown": "unknown",
+}
+
+
+class VDBHeaderError(ValueError):
+    """Raised when a file is not a valid OpenVDB file."""
+
+
+class _Reader(object):
+    """Sequential little-endian reader over a memory mapped buffer."""
+
+    def __init__(self, buffer: mmap.mmap, offset: int = 0):
+        self.buffer = buffer
+        self.offset = offset
+
+    def read(self, size: int) -> bytes:
+        end = self.offset + size
+        if end > len(self.buffer):
+            raise VDBHeaderError("Unexpected end of file.")
+        data = self.buffer[self.offset:end]
+        self.offset = end
+        return data
+
+    def unpack(self, fmt: str) -> Any:
+        size = struct.calcsize(fmt)
+        return struct.unpack(f"<{fmt}", self.read(size))[0]
+
+    def read_string(self) -> str:
+        return self.read(self.unpack("I")).decode("utf-8", "replace")
+
+    def skip_metadata(self):
+        """Skip a metadata map."""
+        for _ in range(self.unpack("I")):
+            self.read_string()  # name
+            self.read_string()  # type name
+            self.read(self.unpack("I"))  # value
+
+    def read_string_metadata(self) -> dict[str, str]:
+        """Read a metadata map, only decoding the string values."""
+        metadata = {}
+        for _ in range(self.unpack("I")):
+            name = self.read_string()
+            type_name = self.read_string()
+            value = self.read(self.unpack("I"))
+            if type_name == "string":
+                metadata[name] = value.decode("utf-8", "replace")
+        return metadata
+
+
+def _parse_grid_descriptors(buffer: mmap.mmap) -> list[dict[str, Any]]:
+    reader = _Reader(buffer)
+
+    # Header
+    if reader.unpack("q") != VDB_MAGIC:
+        raise VDBHeaderError("Not an OpenVDB file.")
+    version = reader.unpack("I")
+    if version >= FILE_VERSION_LIBRARY_VERSION:
+        reader.read(8)  # library major and minor version
+    has_grid_offsets = True
+    if version >= FILE_VERSION_GRID_OFFSETS:
+        has_grid_offsets = bool(reader.unpack("b"))
+    if (
+        FILE_VERSION_SELECTIVE_COMPRESSION
+        <= version
+        < FILE_VERSION_NODE_MASK_COMPRESSION
+    ):
+        reader.read(1)  # is compressed
+    if version >= FILE_VERSION_BOOST_UUID:
+        reader.read(36)  # ASCII UUID
+    else:
+        reader.read(16)  # UUID bytes
+
+    # File metadata
+    reader.skip_metadata()
+
+    grids = []
+    for _ in range(reader.unpack("i")):
+        unique_name = reader.read_string()
+        grid_type = reader.read_string()
+        if grid_type.endswith(HALF_FLOAT_TYPENAME_SUFFIX):
+            grid_type = grid_type[:-len(HALF_FLOAT_TYPENAME_SUFFIX)]
+        if version >= FILE_VERSION_GRID_INSTANCING:
+            reader.read_string()  # instance parent name
+        grid_pos, _block_pos, end_pos = (
+            reader.unpack("q"), reader.unpack("q"), reader.unpack("q")
+        )
+
+        name, _, index = unique_name.partition(GRID_NAME_SEPARATOR)
+
+        # Tree type names are like `Tree_float_5_4_3`
+        value_type = grid_type.split("_")[1] if "_" in grid_type else ""
+
+        # Grid metadata follows the per grid compression flags
+        grid_reader = _Reader(buffer, grid_pos if has_grid_offsets else
+                              reader.offset)
+        if version >= FILE_VERSION_NODE_MASK_COMPRESSION:
+            grid_reader.read(4)
+        metadata = grid_reader.read_string_metadata()
+
+        grids.append({
+            "name": name,
+            "index": int(index) if index.isdigit() else 0,
+            "type": grid_type,
+            "value_type": value_type,
+            "class": metadata.get("class", "unknown"),
+        })
+
+        if not has_grid_offsets:
+            # Streamed files store the grids inline without their end
+            # position, so finding the next grid requires reading the tree.
+            break
+        reader.offset = end_pos
+
+    return grids
+
+
+@lru_cache(maxsize=1024)
+def _read_grid_descriptors(
+    path: str,
+    mtime_ns: int,
+    size: int
+) -> tuple[dict[str, Any], ...]:
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return tuple(_parse_grid_descriptors(buffer))
+
+
+def read_grid_descriptors(path: str) -> list[dict[str, Any]]:
+    """Return the grids stored in an OpenVDB file.
+
+    The result is cached per file path and modification time, so reading
+    the same file again is free until the file changes on disk.
+
+    Arguments:
+        path (str): Path to the `.vdb` file.
+
+    Returns:
+        list[dict[str, Any]]: The grids in file order, each with `name`,
+            `index` (among grids with the same name), `type` (the tree type
+            name), `value_type` and `class` keys.
+
+    Raises:
+        VDBHeaderError: If the file is not a valid OpenVDB file.
+        OSError: If the file can not be read.
+
+    """
+    stat = os.stat(path)
+    if not stat.st_size:
+        raise VDBHeaderError(f"Empty file: {path}")
+    grids = _read_grid_descriptors(path, stat.st_mtime_ns, stat.st_size)
+    return [dict(grid) for grid in grids]
+
+
+def read_sequence_grid_descriptors(
+    paths: list[str]
+) -> list[dict[str, Any]]:
+    """Return the grids of a sequence of OpenVDB files.
+
+    Only the first and last file are read if both have the same grids.
+    Otherwise, the grid layout changes along the sequence and all files are
+    read to return the union of the grids, in order of first appearance.
+
+    Arguments:
+        paths (list[str]): Paths to the `.vdb` files in frame order.
+
+    Returns:
+        list[dict[str, Any]]: The grids of the sequence.
+
+    """
+    if not paths:
+        return []
+
+    def _key(grid: dict[str, Any]) -> tuple[str, int]:
+        return grid["name"], grid["index"]
+
+    grids = read_grid_descriptors(paths[0])
+    if len(paths) == 1:
+        return grids
+
+    last_grids = read_grid_descriptors(paths[-1])
+    if [_key(grid) for grid in grids] == [_key(grid) for grid in last_grids]:
+        return grids
+
+    log.debug("Grid layout changes along sequence, reading all frames.")
+    grids_by_key = {}
+    for path in paths:
+        for grid in read_grid_descriptors(path):
+            grids_by_key.setdefault(_key(grid), grid)
+    return list(grids_by_key.values())
+
+
+def get_field_data_type(grid: dict[str, Any]) -> Optional[str]:
+    """Return the `UsdVol.OpenVDBAsset` fieldDataType of a grid, if any."""
+    return FIELD_DATA_TYPES.get(grid["value_type"])
+
+
+def get_field_class(grid: dict[str, Any]) -> str:
+    """Return the `UsdVol.OpenVDBAsset` fieldClass of a grid."""
+    return FIELD_CLASSES.get(grid["class"], "unknown")
@@ -1,12 +1,40 @@
 """Host API required Work Files tool"""
-from typing import Optional
-from pxr import Sdf
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Optional
 
-import opendcc.core
-import opendcc.file_menu
-import opendcc.stage_utils
+from ayon_core.lib import filter_profiles
+from ayon_core.settings import get_current_project_settings
 
-from .lib import get_current_stage, get_session
+from qtpy import QtCore
+from pxr import Sdf, Usd
+
+from .dirty_layers import get_dirty_layer_tracker
+from .backends import StageBackend, get_backend
+from .lib import (
+    get_current_stage,
+    get_current_task_entity,
+    migrate_instances_data,
+)
+from .payloads import (
+    get_load_rules_to_store,
+    load_payloads_in_background,
+    read_load_rules,
+    stop_payload_loader,
+    write_load_rules,
+)
+
+log = logging.getLogger(__name__)
+
+# File magic of the `usdc` file format
+USDC_MAGIC = b"PXR-USDC"
+
+# Maximum number of layers written at the same time
+SAVE_WORKERS = 8
 
 
 def file_extensions() -> list[str]:
@@ -18,56 +46,514 @@ def has_unsaved_changes() -> bool:
     if not stage:
         return False
 
-    # Based on `opendcc.close_event_filter` we check the edit target layer
-    layer = stage.GetEditTarget().GetLayer()
-    if layer.anonymous or layer.dirty:
+    # A root layer that was never saved is always considered unsaved
+    if stage.GetRootLayer().anonymous:
         return True
 
-    # And for sake of completeness we check the root layer
-    layer = stage.GetRootLayer()
-    if layer.anonymous or layer.dirty:
-        return True
-    return False
+    return get_dirty_layer_tracker().has_dirty_layers(stage)
 
 
-def save_file(filepath=None):
-    session = get_session()
+def get_unsaved_layers() -> list[Sdf.Layer]:
+    """Return the dirty layers in the layer stack of the current stage."""
     stage = get_current_stage()
+    if not stage:
+        return []
+    return get_dirty_layer_tracker().get_dirty_layers(stage)
+
+
+def _get_save_settings() -> dict[str, Any]:
+    project_settings = get_current_project_settings()
+    return project_settings["loki"].get("workfile_save", {})
+
+
+def is_background_save_enabled() -> bool:
+    """Return whether the workfile is saved on a background thread."""
+    return _get_save_settings().get("background", False)
+
+
+def _fsync_file(path: str):
+    """Flush a file to disk."""
+    fd = os.open(path, os.O_RDWR)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_directory(path: str):
+    """Flush the entries of a directory, e.g. a rename, to disk."""
+    # Directories can not be opened to sync them on Windows
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def get_export_args(layer: Sdf.Layer) -> dict[str, str]:
+    """Return the file format arguments to export the layer with.
+
+    Exporting a `.usd` layer always writes `usdc`, so the format of the
+    existing file is kept explicitly.
+
+    """
+    if layer.GetFileFormat().formatId != "usd":
+        return {}
+    path = layer.realPath
+    if not path or not os.path.isfile(path):
+        return {}
+    with open(path, "rb") as f:
+        is_usdc = f.read(len(USDC_MAGIC)) == USDC_MAGIC
+    return {"format": "usdc" if is_usdc else "usda"}
+
+
+def save_layer(layer: Sdf.Layer) -> dict[str, Any]:
+    """Save the layer and flush it to disk.
+
+    `Sdf.Layer.Save` writes a temporary file and renames it over the layer
+    file, but does not sync either to disk. Both the file and the rename
+    are synced right after, so the save is durable once this returns.
+
+    Returns:
+        dict[str, Any]: The layer `identifier`, `path`, the `bytes` written
+            and the `duration` of the save in seconds.
+
+    """
+    start = time.perf_counter()
+    if not layer.Save():
+        raise RuntimeError(f"Failed to save layer: {layer.identifier}")
+    path = layer.realPath
+    _fsync_file(path)
+    _fsync_directory(os.path.dirname(path))
+    return {
+        "identifier": layer.identifier,
+        "path": path,
+        "bytes": os.path.getsize(path),
+        "duration": time.perf_counter() - start,
+    }
+
+
+def export_layer(
+    layer: Sdf.Layer,
+    filepath: str,
+    args: Optional[dict[str, str]] = None
+) -> dict[str, Any]:
+    """Export the layer to a file atomically and flush it to disk.
+
+    The layer is written straight from memory to a temporary file next to
+    `filepath`, in the file format of the `filepath` extension, and renamed
+    over `filepath` once fully written and synced. Unlike creating a new
+    layer and transferring the content no second copy of the layer is held
+    in memory.
+
+    Arguments:
+        layer (Sdf.Layer): The layer to export.
+        filepath (str): The file path to export to.
+        args (Optional[dict[str, str]]): File format arguments.
+
+    Returns:
+        dict[str, Any]: The layer `identifier`, `path`, the `bytes` written
+            and the `duration` of the export in seconds.
+
+    """
+    start = time.perf_counter()
+    filepath = os.path.abspath(filepath)
+    directory, filename = os.path.split(filepath)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory,
+        prefix=f".{filename}.",
+        suffix=os.path.splitext(filename)[1]
+    )
+    os.close(fd)
+    try:
+        if not layer.Export(tmp_path, args=args or {}):
+            raise RuntimeError(f"Failed to export layer to: {filepath}")
+        _fsync_file(tmp_path)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_directory(directory)
+    return {
+        "identifier": layer.identifier,
+        "path": filepath,
+        "bytes": os.path.getsize(filepath),
+        "duration": time.perf_counter() - start,
+    }
+
+
+def save_layers(layers: list[Sdf.Layer]) -> list[dict[str, Any]]:
+    """Save the layers, writing multiple layers concurrently.
+
+    Multiple layers are exported atomically with `export_layer` on a thread
+    pool, so their writes overlap, e.g. on network storage. Exporting sends
+    no USD notices. The layers are then reloaded from the saved files on
+    the calling thread to clear their dirty state, since that notifies the
+    listeners of the integration.
+
+    Returns:
+        list[dict[str, Any]]: The `save_layer` result per layer.
+
+    """
+    if len(layers) < 2:
+        return [save_layer(layer) for layer in layers]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(
+        max_workers=min(len(layers), SAVE_WORKERS),
+        thread_name_prefix="ayon_loki_save"
+    ) as executor:
+        futures = [
+            executor.submit(
+                export_layer, layer, layer.realPath, get_export_args(layer)
+            )
+            for layer in layers
+        ]
+    results = [future.result() for future in futures]
+
+    for layer in layers:
+        if not layer.Reload(force=True):
+            raise RuntimeError(
+                f"Failed to reload saved layer: {layer.identifier}")
+    log.debug(
+        f"Saved {len(layers)} layers in {time.perf_counter() - start:.3f}s."
+    )
+    return results
+
+
+class BackgroundSave(QtCore.QObject):
+    """Save snapshots of layers to disk on a worker thread.
+
+    The content of the layers is copied into anonymous layers on the thread
+    creating the save, so edits made while saving are not saved and do not
+    race with the worker thread. The snapshots are exported atomically to
+    the layer files with `export_layer`.
+
+    Signals are emitted from the worker thread, so connected slots of
+    objects living on the main thread are called on the main thread. The
+    save reports its progress and failure in the status bar and the log.
+
+    Saved layers stay dirty in USD, because only saving or reloading a
+    layer clears that. Reloading them would block the main thread for
+    longer than saving them synchronously, so instead the dirty layer
+    tracker considers them clean until they are edited again, which is what
+    `has_unsaved_changes` and the next save check.
+
+    """
+    progress = QtCore.Signal(int, int)  # saved layers, total layers
+    finished = QtCore.Signal(list)  # `export_layer` result per layer
+    failed = QtCore.Signal(str)  # error message
+
+    def __init__(self, layers: list[Sdf.Layer]):
+        super().__init__()
+        self._future: Future = Future()
+
+        tracker = get_dirty_layer_tracker()
+        self._snapshots: list[tuple[Sdf.Layer, Sdf.Layer, dict]] = []
+        for layer in layers:
+            # Copying into crate data is several times faster than into the
+            # default in-memory data, whatever the format of the layer
+            snapshot = Sdf.Layer.CreateAnonymous(
+                f"snapshot_{layer.GetDisplayName()}.usdc"
+            )
+            snapshot.TransferContent(layer)
+            self._snapshots.append((layer, snapshot, get_export_args(layer)))
+            # The layer is saved as far as the user is concerned
+            tracker.mark_clean(layer)
+
+        self.progress.connect(self._on_progress)
+        self.finished.connect(self._on_finished)
+        self.failed.connect(self._on_failed)
+
+    def start(self):
+        thread = threading.Thread(
+            target=self._run,
+            name="ayon_loki_background_save",
+            daemon=True
+        )
+        thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> list[dict[str, Any]]:
+        """Wait for the save to finish and return the results.
+
+        Raises:
+            Exception: The error saving the layers failed with.
+
+        """
+        return self._future.result(timeout)
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def _on_progress(self, saved: int, total: int):
+        get_backend().show_status(f"Saving layers... {saved}/{total}")
+
+    def _on_finished(self, results: list[dict[str, Any]]):
+        message = f"Saved {len(results)} layers in the background."
+        log.info(message)
+        get_backend().show_status(message, 5000)
+
+    def _on_failed(self, message: str):
+        log.error(f"Saving the layers in the background failed: {message}")
+        get_backend().show_status(f"Saving failed: {message}")
+
+    def _run(self):
+        start = time.perf_counter()
+        total = len(self._snapshots)
+        results = []
+        try:
+            for layer, snapshot, args in self._snapshots:
+                results.append(export_layer(snapshot, layer.realPath, args))
+                self.progress.emit(len(results), total)
+        except Exception as exc:
+            # Layers are not saved, so consider them dirty again
+            tracker = get_dirty_layer_tracker()
+            for layer, _snapshot, _args in self._snapshots:
+                tracker.mark_dirty(layer)
+            self._snapshots.clear()
+            self._future.set_exception(exc)
+            self.failed.emit(str(exc))
+            return
+
+        self._snapshots.clear()
+        log.debug(
+            f"Saved {total} dirty layers in the background in "
+            f"{time.perf_counter() - start:.3f}s."
+        )
+        self._future.set_result(results)
+        self.finished.emit(results)
+
+
+_BACKGROUND_SAVE: Optional[BackgroundSave] = None
+
+
+def get_background_save() -> Optional[BackgroundSave]:
+    """Return the last started background save, if any."""
+    return _BACKGROUND_SAVE
+
+
+def wait_for_background_save(
+    timeout: Optional[float] = None
+) -> list[dict[str, Any]]:
+    """Wait for the last started background save to finish.
+
+    Returns:
+        list[dict[str, Any]]: The `export_layer` result per saved layer.
+
+    Raises:
+        Exception: The error the background save failed with.
+
+    """
+    background_save = _BACKGROUND_SAVE
+    if background_save is None:
+        return []
+    return background_save.wait(timeout)
+
+
+def save_file(
+    filepath=None,
+    background: bool = False
+) -> list[dict[str, Any]]:
+    """Save the current stage.
+
+    Arguments:
+        filepath (Optional[str]): The file path to save the root layer to.
+            Defaults to the current file path of the root layer.
+        background (bool): Save the layers on a worker thread when saving to
+            the current file path. The returned results are then empty and
+            the save can be awaited with `wait_for_background_save`.
+
+    Returns:
+        list[dict[str, Any]]: The save result per saved layer.
+
+    """
+    global _BACKGROUND_SAVE
+
+    backend = get_backend()
+    stage = backend.get_current_stage()
     if stage is None:
         raise RuntimeError(
             "No active stage to save. Create or open a stage first.")
 
+    # Never write the layers while a previous save is still writing them
+    if _BACKGROUND_SAVE is not None:
+        try:
+            wait_for_background_save()
+        except Exception as exc:
+            log.warning(f"Previous background save failed: {exc}")
+        _BACKGROUND_SAVE = None
+
     layer = stage.GetRootLayer()
-    if filepath is None:
-        layer.Save()
 
-    # Based on opendcc.file_menu `on_save` logic
-    # Check if saving to different suffix, if so we reopen the layer
+    # Store the loaded payloads so the workfile can be opened with the same,
+    # but only if the workfile is opened that way
+    if get_workfile_open_profile()["load"] == "rules":
+        write_load_rules(layer, get_load_rules_to_store(stage))
+
+    # Store instance data of older layouts in the current layout
+    migrated = migrate_instances_data(stage)
+    if migrated:
+        log.info(f"Migrated the data of {migrated} instances on save.")
+
+    save_in_place = filepath is None or (
+        not layer.anonymous
+        and os.path.normcase(os.path.abspath(filepath))
+        == os.path.normcase(os.path.abspath(layer.realPath))
+    )
+
+    # Save all dirty layers of the layer stack that have a file to save to,
+    # including the root layer if it is saved to its current file
+    layers = [
+        dirty_layer for dirty_layer in get_unsaved_layers()
+        if not dirty_layer.anonymous
+        and (save_in_place or dirty_layer != layer)
+    ]
+    # Saving in the background requires the application's event loop
+    if background and save_in_place and backend.interactive:
+        _BACKGROUND_SAVE = BackgroundSave(layers)
+        _BACKGROUND_SAVE.start()
+        return []
+
+    results = save_layers(layers)
+    if save_in_place:
+        log.debug(f"Saved {len(results)} dirty layers.")
+        return results
+
+    # Save the root layer to the new file path, unless it is anonymous or
+    # another layer is already open at that path
     old_suffix = layer.GetFileFormat().formatId.lower()
     new_suffix = filepath.split(".")[-1].lower()
-    if old_suffix != new_suffix:
-        new_layer = Sdf.Layer.FindOrOpen(filepath)
-        if new_layer:
-            new_layer.Clear()
-        else:
-            new_layer = Sdf.Layer.CreateNew(filepath)
-        new_layer.TransferContent(layer)
-        new_layer.Save()
-        opendcc.file_menu.add_recent_file(new_layer.identifier)
-        opendcc.stage_utils.open_stage(new_layer.identifier)
+    if (
+        old_suffix == new_suffix
+        and not layer.anonymous
+        and Sdf.Layer.Find(filepath) in (None, layer)
+    ):
+        layer.identifier = filepath
+        results.append(save_layer(layer))
+        _update_file_ui(backend, filepath)
+        return results
 
-    # Otherwise just update current layer
-    layer.identifier = filepath
-    layer.Save()
-    opendcc.file_menu.add_recent_file(layer.identifier)
+    # A layer can't change its file format, so export the root layer to
+    # the new file and continue with a stage on that file
+    results.append(export_layer(layer, filepath))
+    _open_converted_root_layer(backend, stage, filepath)
+    _update_file_ui(backend, filepath)
+    return results
+
+
+def _update_file_ui(backend: StageBackend, filepath):
+    """Add the file to the recent files and refresh the stage list."""
+    backend.add_recent_file(filepath)
 
     # force ui update
-    session.force_update_stage_list()
+    backend.refresh_stage_list()
+
+
+def _open_converted_root_layer(
+    backend: StageBackend,
+    stage: Usd.Stage,
+    filepath: str
+) -> Usd.Stage:
+    """Make the current stage use the root layer exported to `filepath`.
+
+    A layer can not change its file format, so a stage is opened for the
+    exported root layer instead. The current stage is kept alive until the
+    new stage is open so that its sublayers and loaded payloads are reused
+    from the layer registry instead of being read from disk again. The
+    session layer, muted layers, load rules and edit target are carried
+    over.
+
+    """
+    # Payloads still loading in the background are loaded right away, since
+    # the loader can't continue on the new stage
+    load_rules = get_load_rules_to_store(stage)
+    stop_payload_loader()
+
+    root_layer = Sdf.Layer.Find(filepath)
+    if root_layer:
+        # Discard stale content of a previously opened layer at the path
+        root_layer.Reload(force=True)
+    else:
+        root_layer = Sdf.Layer.FindOrOpen(filepath)
+    if not root_layer:
+        raise RuntimeError(f"Failed to open converted layer: {filepath}")
+
+    new_stage = Usd.Stage.Open(
+        root_layer, stage.GetSessionLayer(), Usd.Stage.LoadNone
+    )
+    new_stage.MuteAndUnmuteLayers(stage.GetMutedLayers(), [])
+    new_stage.SetLoadRules(load_rules)
+
+    edit_layer = stage.GetEditTarget().GetLayer()
+    if edit_layer != stage.GetRootLayer() and new_stage.HasLocalLayer(
+        edit_layer
+    ):
+        new_stage.SetEditTarget(Usd.EditTarget(edit_layer))
+
+    backend.set_current_stage(new_stage)
+    return new_stage
+
+
+def get_workfile_open_profile() -> dict[str, Any]:
+    """Return the workfile open settings profile of the current task."""
+    project_settings = get_current_project_settings()
+    open_settings = project_settings["loki"].get("workfile_open", {})
+    task_entity = get_current_task_entity()
+    task_type = task_entity["taskType"] if task_entity else None
+    profile = filter_profiles(
+        open_settings.get("profiles", []),
+        {"task_types": task_type},
+        logger=log
+    )
+    return {
+        "load": "all",
+        "deferred": False,
+        **(profile or {}),
+        "batch_size": open_settings.get("batch_size", 10),
+    }
 
 
 def open_file(filepath):
-    result = get_session().open_stage(filepath)
-    opendcc.file_menu.add_recent_file(filepath)
+    start = time.perf_counter()
+    backend = get_backend()
+    profile = get_workfile_open_profile()
+
+    # Never keep loading payloads of the stage that gets closed
+    stop_payload_loader()
+
+    # Loading in the background requires the application's event loop
+    deferred = profile["deferred"] and backend.interactive
+    if profile["load"] == "all" and not deferred:
+        backend.open_stage(filepath)
+    else:
+        stage = Usd.Stage.Open(filepath, Usd.Stage.LoadNone)
+        if profile["load"] == "none":
+            rules = Usd.StageLoadRules.LoadNone()
+        elif profile["load"] == "rules":
+            rules = read_load_rules(stage.GetRootLayer())
+            if rules is None:
+                log.debug("No stored load rules found, loading all payloads.")
+                rules = Usd.StageLoadRules.LoadAll()
+        else:
+            rules = Usd.StageLoadRules.LoadAll()
+
+        if not deferred:
+            stage.SetLoadRules(rules)
+        backend.set_current_stage(stage)
+
+        if deferred:
+            load_payloads_in_background(
+                stage, rules, profile["batch_size"], start_time=start
+            )
+
+    backend.add_recent_file(filepath)
+    log.info(
+        f"Opened workfile in {time.perf_counter() - start:.3f}s "
+        f"(load: {profile['load']}, deferred: {deferred}): {filepath}"
+    )
 
 
 def current_file() -> Optional[str]:
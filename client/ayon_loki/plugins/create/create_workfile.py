@@ -1,6 +1,7 @@
 import ayon_api
 from ayon_core.pipeline import CreatedInstance, AutoCreator, AYON_INSTANCE_ID
 from ayon_loki.api import lib
+from ayon_loki.api.layer_data import get_layer_data_cache
 
 
 class CreateWorkfile(AutoCreator):
@@ -105,7 +106,9 @@ class CreateWorkfile(AutoCreator):
         if not stage:
             return
 
-        workfile_data = stage.GetRootLayer().customLayerData.get(self.data_key)
+        workfile_data = get_layer_data_cache().get(
+            stage.GetRootLayer(), self.data_key
+        )
         if not workfile_data:
             return
 
@@ -121,11 +124,9 @@ class CreateWorkfile(AutoCreator):
             return
 
         root_layer = stage.GetRootLayer()
-        layer_data = root_layer.customLayerData
         for created_inst, _changes in update_list:
             new_data = created_inst.data_to_store()
-            layer_data[self.data_key] = new_data
-        root_layer.customLayerData = layer_data
+            get_layer_data_cache().set(root_layer, self.data_key, new_data)
 
     def remove_instances(self, instances):
         stage = lib.get_current_stage()
@@ -133,10 +134,7 @@ class CreateWorkfile(AutoCreator):
             return
 
         # Remove the custom data
-        root_layer = stage.GetRootLayer()
-        layer_data = root_layer.customLayerData
-        layer_data.pop(self.data_key, None)
-        root_layer.customLayerData = layer_data
+        get_layer_data_cache().remove(stage.GetRootLayer(), self.data_key)
 
         # Remove the instance (should only ever be one)
         for instance in instances:
@@ -0,0 +1,137 @@
+import ayon_api
+from ayon_core.pipeline import (
+    InventoryAction,
+    discover_loader_plugins,
+    get_current_project_name,
+)
+from ayon_core.pipeline.load import get_representation_contexts_by_ids
+from ayon_loki.api import plugin
+
+
+class UpdateContainersToLatest(InventoryAction):
+    """Update the selected containers to their latest versions at once.
+
+    The containers are grouped by loader and each Loki loader updates all of
+    its containers with a single `LokiLoader.update_batch`, so the stage
+    recomposes once per loader instead of once per container.
+
+    """
+
+    label = "Update to latest (batched)"
+    icon = "angle-double-up"
+    color = "#d8d8d8"
+    order = -1
+
+    @staticmethod
+    def is_compatible(container):
+        return bool(container.get("loader"))
+
+    def process(self, containers):
+        project_name = get_current_project_name()
+        loaders_by_name = {
+            loader.__name__: loader
+            for loader in discover_loader_plugins(project_name)
+        }
+
+        containers_by_project: dict[str, list] = {}
+        for container in containers:
+            containers_by_project.setdefault(
+                container.get("project_name") or project_name, []
+            ).append(container)
+
+        # Group the outdated containers by loader
+        items_by_loader: dict[str, list] = {}
+        for container_project_name, project_containers in (
+            containers_by_project.items()
+        ):
+            latest_repre_ids = self._get_latest_representation_ids(
+                container_project_name, project_containers
+            )
+            contexts = get_representation_contexts_by_ids(
+                container_project_name, set(latest_repre_ids.values())
+            )
+            for container in project_containers:
+                repre_id = latest_repre_ids.get(container["representation"])
+                if not repre_id or repre_id == container["representation"]:
+                    continue
+                items_by_loader.setdefault(container["loader"], []).append(
+                    (container, contexts[repre_id])
+                )
+
+        for loader_name, items in items_by_loader.items():
+            loader_cls = loaders_by_name.get(loader_name)
+            if loader_cls is None:
+                self.log.warning(
+                    f"Unable to update {len(items)} containers, loader "
+                    f"'{loader_name}' not found."
+                )
+                continue
+
+            loader = loader_cls()
+            if isinstance(loader, plugin.LokiLoader):
+                loader.update_batch(items)
+                continue
+
+            for container, context in items:
+                loader.update(container, context)
+
+        # Refresh the scene inventory
+        return True
+
+    @staticmethod
+    def _get_latest_representation_ids(
+        project_name: str,
+        containers: list[dict]
+    ) -> dict[str, str]:
+        """Return the latest version's representation id per representation.
+
+        The representation of the latest version is matched by name.
+
+        """
+        repre_entities = list(ayon_api.get_representations(
+            project_name,
+            representation_ids={
+                container["representation"] for container in containers
+            },
+            fields={"id", "name", "versionId"}
+        ))
+        version_entities = ayon_api.get_versions(
+            project_name,
+            version_ids={repre["versionId"] for repre in repre_entities},
+            fields={"id", "productId"}
+        )
+        product_id_by_version_id = {
+            version["id"]: version["productId"]
+            for version in version_entities
+        }
+        last_versions = ayon_api.get_last_versions(
+            project_name,
+            product_ids=set(product_id_by_version_id.values()),
+            fields={"id", "productId"}
+        )
+        last_version_ids = {
+            product_id: version["id"]
+            for product_id, version in last_versions.items()
+        }
+        latest_repre_by_key = {
+            (repre["versionId"], repre["name"]): repre["id"]
+            for repre in ayon_api.get_representations(
+                project_name,
+                version_ids=set(last_version_ids.values()),
+                representation_names={
+                    repre["name"] for repre in repre_entities
+                },
+                fields={"id", "name", "versionId"}
+            )
+        }
+
+        latest_repre_ids = {}
+        for repre in repre_entities:
+            product_id = product_id_by_version_id.get(repre["versionId"])
+            last_version_id = last_version_ids.get(product_id)
+            latest_repre_id = latest_repre_by_key.get(
+                (last_version_id, repre["name"])
+            )
+            if latest_repre_id:
+                latest_repre_ids[repre["id"]] = latest_repre_id
+        return latest_repre_ids
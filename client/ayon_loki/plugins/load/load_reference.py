@@ -24,7 +24,7 @@ class ReferenceLoader(plugin.LokiLoader):
 
         name = name or context["product"]["name"]
 
-        path = lib.unique_path(stage, Sdf.Path(f"/{name}"))
+        path = self.unique_path(stage, Sdf.Path(f"/{name}"))
         prim = stage.DefinePrim(path)
 
         data = {}
@@ -48,35 +48,32 @@ class ReferenceLoader(plugin.LokiLoader):
         spec: Sdf.PrimSpec = container["spec"]
         lib.remove_spec(spec)
 
-    def update(self, container, context):
-        spec: Sdf.PrimSpec = container["spec"]
-        reference: Sdf.Reference = container["reference"]
-
-        filepath = self.filepath_from_context(context)
-
-        # Replace the Sdf.Reference with a new one
+    def update_spec(self, spec: Sdf.PrimSpec, items):
+        # Collect the new Sdf.Reference for each of the container references
+        new_references: dict[Sdf.Reference, Sdf.Reference] = {}
+        for container, context in items:
+            ref: Sdf.Reference = container["reference"]
+            filepath = self.filepath_from_context(context)
+
+            # Update representation data
+            data = ref.customData
+            data["AYON"]["representation"] = context["representation"]["id"]
+            data["AYON"]["project_name"] = context["project"]["name"]
+
+            new_references[ref] = Sdf.Reference(
+                assetPath=filepath,
+                primPath=ref.primPath,
+                layerOffset=ref.layerOffset,
+                customData=data
+            )
+
+        # Replace the Sdf.References with the new ones
         for key in lib.USD_LIST_ATTRS:
             reference_list = getattr(spec.referenceList, key)
             for index, ref in enumerate(reference_list):
-                if ref != reference:
-                    continue
-
-                data = ref.customData
-
-                # Update representation data
-                data["AYON"]["representation"] = context["representation"]["id"]
-                data["AYON"]["project_name"] = context["project"]["name"]
-
-                # Replace this index with the new SdfReference
-                reference_list[index] = Sdf.Reference(
-                    assetPath=filepath,
-                    primPath=ref.primPath,
-                    layerOffset=ref.layerOffset,
-                    customData=data
-                )
-
-                # We should only ever update one
-                return
+                new_reference = new_references.get(ref)
+                if new_reference is not None:
+                    reference_list[index] = new_reference
 
     def switch(self, container, context):
         self.update(container, context)
\ No newline at end of file
@@ -1,7 +1,12 @@
+import os
+from typing import Any, Optional, Union
+
+import clique
+
 from ayon_core.pipeline import AYON_CONTAINER_ID
-from ayon_loki.api import plugin, lib
+from ayon_loki.api import plugin, lib, vdb
 
-from pxr import Sdf, Usd, UsdVol
+from pxr import Sdf, Tf
 
 
 class LoadOpenVDBAsset(plugin.LokiLoader):
@@ -22,57 +27,260 @@ class LoadOpenVDBAsset(plugin.LokiLoader):
 
         name = name or context["product"]["name"]
 
-        path = lib.unique_path(stage, Sdf.Path(f"/{name}"))
-
-        volume = UsdVol.OpenVDBAsset.Define(stage, path)
-        self._set_filepath(volume, context)
-
-        # TODO: We must set the following attributes on the OpenVDBAsset:
-        #  fieldIndex, fieldName, fieldClass, fieldDataType
-        #  For this we must parse the VDB file and get the field information
-        #  However, `pyopenvdb` is not included with Loki
-
-        # Imprint property with container metadata
-        attr = volume.GetFilePathAttr()
-        data = attr.GetCustomData()
-        data["AYON"] = {
-            "schema": "ayon:container-3.0",
-            "id": AYON_CONTAINER_ID,
-            "loader": self.__class__.__name__,
-            "representation": context["representation"]["id"],
-            "project_name": context["project"]["name"],
-        }
-        attr.SetCustomData(data)
+        path = self.unique_path(stage, Sdf.Path(f"/{name}"))
+
+        # Author the volume with a field per grid in the VDB file
+        edit_target = stage.GetEditTarget()
+        with Sdf.ChangeBlock():
+            volume_spec = Sdf.CreatePrimInLayer(
+                edit_target.GetLayer(), edit_target.MapToSpecPath(path)
+            )
+            volume_spec.specifier = Sdf.SpecifierDef
+            volume_spec.typeName = "Volume"
+            file_path_specs = self._author_fields(volume_spec, context)
+
+            # Imprint the first field's file path with container metadata
+            spec = file_path_specs[0]
+            spec.customData["AYON"] = {
+                "schema": "ayon:container-3.0",
+                "id": AYON_CONTAINER_ID,
+                "loader": self.__class__.__name__,
+                "representation": context["representation"]["id"],
+                "project_name": context["project"]["name"],
+            }
 
     def remove(self, container):
         # TODO: Remove the volume loader from all layers in layer stack?
         spec: Sdf.PropertySpec = container["spec"]
-        prim_spec: Sdf.PrimSpec = spec.owner
+        prim_spec: Sdf.PrimSpec = self._get_volume_spec(spec) or spec.owner
         lib.remove_spec(prim_spec)
 
-    def update(self, container, context):
-        # TODO: Should we update in the spec only instead of via the stage?
-        spec: Sdf.PropertySpec = container["spec"]
-        stage = lib.get_current_stage()
-        prim = stage.GetPrimAtPath(spec.owner.path)
-        volume = UsdVol.OpenVDBAsset(prim)
-        self._set_filepath(volume, context)
+    def update_spec(self, spec: Sdf.AttributeSpec, items):
+        # Only the last update matters if a spec is listed multiple times
+        _container, context = items[-1]
+
+        volume_spec = self._get_volume_spec(spec)
+        if volume_spec:
+            self._author_fields(volume_spec, context)
+        else:
+            # Field loaded on its own without a parent volume
+            self._set_filepath(spec, self._get_filepaths(context))
 
         # Update imprinted data like representation id, project name
-        data = spec.customData
-        data["AYON"]["representation"] = context["representation"]["id"]
-        data["AYON"]["project_name"] = context["project"]["name"]
-        spec.customData = data
+        data = dict(spec.customData["AYON"])
+        data["representation"] = context["representation"]["id"]
+        data["project_name"] = context["project"]["name"]
+        spec.customData["AYON"] = data
 
     def switch(self, container, context):
         self.update(container, context)
 
-    def _set_filepath(self, volume: UsdVol.OpenVDBAsset, context):
-        attr = volume.GetFilePathAttr()
-        attr.Set(self.filepath_from_context(context))
+    def _author_fields(
+        self,
+        volume_spec: Sdf.PrimSpec,
+        context
+    ) -> list[Sdf.AttributeSpec]:
+        """Author the file path of all fields of the volume.
+
+        A field prim is created for each grid in the VDB file(s) that does
+        not have one yet. Existing fields of grids that the VDB file(s) no
+        longer contain are deactivated and disconnected from the volume, and
+        reactivated when a later version contains the grid again. The
+        fields are deactivated instead of removed so the container data
+        authored on a field stays in place.
+
+        Returns:
+            list[Sdf.AttributeSpec]: The file path attribute spec per field.
+
+        """
+        filepaths = self._get_filepaths(context)
+        grids = self._get_grids(filepaths)
+        field_names = {self._get_field_prim_name(grid) for grid in grids}
+        if not grids and not any(
+            child.typeName == "OpenVDBAsset"
+            for child in volume_spec.nameChildren
+        ):
+            # Without grid information we still need a field to load into
+            grids = [None]
+
+        for grid in grids:
+            field_name = self._get_field_prim_name(grid)
+            if field_name not in volume_spec.nameChildren:
+                self._author_field(volume_spec, field_name, grid)
+
+        file_path_specs = []
+        for field_spec in volume_spec.nameChildren:
+            if field_spec.typeName != "OpenVDBAsset":
+                continue
+
+            # Keep all fields if the grids are unknown, e.g. unreadable files
+            if field_names:
+                self._set_field_active(
+                    volume_spec, field_spec, field_spec.name in field_names
+                )
+
+            file_path_spec = field_spec.attributes.get("filePath")
+            if file_path_spec is None:
+                file_path_spec = Sdf.AttributeSpec(
+                    field_spec, "filePath", Sdf.ValueTypeNames.Asset
+                )
+            self._set_filepath(file_path_spec, filepaths)
+            file_path_specs.append(file_path_spec)
+
+        return file_path_specs
+
+    @staticmethod
+    def _set_field_active(
+        volume_spec: Sdf.PrimSpec,
+        field_spec: Sdf.PrimSpec,
+        active: bool
+    ):
+        """Activate the field and relate it to the volume, or the reverse."""
+        relationship_name = f"field:{field_spec.name}"
+        relationship_spec = volume_spec.relationships.get(relationship_name)
+        if active:
+            if field_spec.HasInfo("active"):
+                field_spec.ClearInfo("active")
+            if relationship_spec is None:
+                relationship_spec = Sdf.RelationshipSpec(
+                    volume_spec, relationship_name, custom=False
+                )
+                relationship_spec.targetPathList.explicitItems = [
+                    field_spec.path
+                ]
+            return
+
+        field_spec.active = False
+        if relationship_spec is not None:
+            volume_spec.RemoveProperty(relationship_spec)
 
-    def _get_filepaths(self, context):
-        # TODO: Return individual frames if a sequence so we instead set the
-        #  individual frames as timesamples for all frames (or somehow use a
-        #  loki expression?)
-        return self.filepath_from_context(context)
\ No newline at end of file
+    @staticmethod
+    def _author_field(
+        volume_spec: Sdf.PrimSpec,
+        field_name: str,
+        grid: Optional[dict[str, Any]]
+    ) -> Sdf.PrimSpec:
+        """Author an OpenVDBAsset field prim for the grid under the volume.
+
+        Without grid information only the prim and its relationship from
+        the volume are authored.
+
+        """
+        field_spec = Sdf.PrimSpec(
+            volume_spec, field_name, Sdf.SpecifierDef, "OpenVDBAsset"
+        )
+        if grid:
+            values = {
+                "fieldName": (Sdf.ValueTypeNames.Token, grid["name"]),
+                "fieldIndex": (Sdf.ValueTypeNames.Int, grid["index"]),
+                "fieldClass": (
+                    Sdf.ValueTypeNames.Token, vdb.get_field_class(grid)
+                ),
+            }
+            data_type = vdb.get_field_data_type(grid)
+            if data_type:
+                values["fieldDataType"] = (Sdf.ValueTypeNames.Token, data_type)
+            for attr_name, (type_name, value) in values.items():
+                attr_spec = Sdf.AttributeSpec(field_spec, attr_name, type_name)
+                attr_spec.default = value
+
+        relationship_spec = Sdf.RelationshipSpec(
+            volume_spec, f"field:{field_name}", custom=False
+        )
+        relationship_spec.targetPathList.explicitItems = [field_spec.path]
+        return field_spec
+
+    def _get_grids(
+        self,
+        filepaths: Union[str, dict[float, str]]
+    ) -> list[dict[str, Any]]:
+        """Return the grids of the VDB file(s), empty if unreadable."""
+        if isinstance(filepaths, str):
+            paths = [filepaths]
+        else:
+            paths = [filepaths[frame] for frame in sorted(filepaths)]
+
+        try:
+            return vdb.read_sequence_grid_descriptors(paths)
+        except (OSError, vdb.VDBHeaderError) as exc:
+            self.log.warning(f"Unable to read VDB grids from {paths[0]}: {exc}")
+            return []
+
+    @staticmethod
+    def _get_field_prim_name(grid: Optional[dict[str, Any]]) -> str:
+        if not grid:
+            return "field"
+        name = Tf.MakeValidIdentifier(grid["name"])
+        if grid["index"]:
+            name = f"{name}_{grid['index']}"
+        return name
+
+    @staticmethod
+    def _get_volume_spec(spec: Sdf.AttributeSpec) -> Optional[Sdf.PrimSpec]:
+        """Return the volume prim spec of the field holding `spec`, if any."""
+        volume_spec = spec.owner.nameParent
+        if volume_spec and volume_spec.typeName == "Volume":
+            return volume_spec
+        return None
+
+    def _set_filepath(
+        self,
+        spec: Sdf.AttributeSpec,
+        filepaths: Union[str, dict[float, str]]
+    ):
+        """Author the file path, or a time sample per frame for sequences.
+
+        The values are authored directly on the attribute spec so that a
+        long sequence does not trigger a stage change per frame.
+
+        Arguments:
+            spec (Sdf.AttributeSpec): The filePath attribute spec.
+            filepaths (Union[str, dict[float, str]]): The file path or the
+                file path per frame for a sequence.
+
+        """
+        with Sdf.ChangeBlock():
+            # Clear any previously authored values
+            spec.ClearDefaultValue()
+            if spec.HasInfo("timeSamples"):
+                spec.ClearInfo("timeSamples")
+
+            if isinstance(filepaths, str):
+                spec.default = Sdf.AssetPath(filepaths)
+                return
+
+            # The Python bindings can't set the `timeSamples` field as a
+            # whole, so set the samples one by one inside the change block
+            layer = spec.layer
+            for frame, filepath in filepaths.items():
+                layer.SetTimeSample(spec.path, frame, Sdf.AssetPath(filepath))
+
+    def _get_filepaths(self, context) -> Union[str, dict[float, str]]:
+        """Return file path, or file path per frame if it is a sequence.
+
+        Returns:
+            Union[str, dict[float, str]]: File path per frame for a sequence
+                representation, otherwise the single file path.
+
+        """
+        filepath = self.filepath_from_context(context)
+        files = context["representation"].get("files", [])
+        if len(files) < 2:
+            return filepath
+
+        names = [os.path.basename(file["path"]) for file in files]
+        collections, _remainder = clique.assemble(
+            names,
+            patterns=[clique.PATTERNS["frames"]],
+            minimum_items=1
+        )
+        if not collections:
+            return filepath
+
+        # Files of the sequence live next to the first frame's file
+        directory = os.path.dirname(filepath)
+        collection = collections[0]
+        return {
+            float(frame): os.path.join(directory, name)
+            for frame, name in zip(sorted(collection.indexes), collection)
+        }
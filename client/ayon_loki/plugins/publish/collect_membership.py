@@ -0,0 +1,29 @@
+import pyblish.api
+
+from ayon_loki.api import lib
+
+from pxr import Usd
+
+
+class CollectInstanceMembership(pyblish.api.InstancePlugin):
+    """Collect the members of the instance collection as instance members.
+
+    The membership query is computed once and cached on the instance, so
+    other publish plugins get it through `lib.get_instance_membership_query`
+    instead of computing it again.
+    """
+
+    order = pyblish.api.CollectorOrder - 0.4
+    label = "Loki Instance Membership"
+    hosts = ["loki"]
+
+    def process(self, instance):
+        query = lib.get_instance_membership_query(instance)
+        if query is None:
+            self.log.debug("Instance has no collection to query members of.")
+            return
+
+        stage = instance.context.data["stage"]
+        paths = Usd.CollectionAPI.ComputeIncludedPaths(query, stage)
+        instance[:] = [path.pathString for path in paths]
+        self.log.debug(f"Collected {len(instance)} members.")
@@ -6,6 +6,7 @@ from ayon_core.pipeline.publish import (
     KnownPublishError,
     OptionalPyblishPluginMixin
 )
+from ayon_loki.api import wait_for_background_save
 
 
 class IncrementCurrentFile(pyblish.api.ContextPlugin,
@@ -24,6 +25,14 @@ class IncrementCurrentFile(pyblish.api.ContextPlugin,
         if not self.is_active(context.data):
             return
 
+        # The workfile must be fully written before publishing finishes
+        try:
+            wait_for_background_save()
+        except Exception as exc:
+            raise KnownPublishError(
+                f"Saving the current file in the background failed: {exc}"
+            ) from exc
+
         # Filename must not have changed since collecting
         host = registered_host()
         current_file = host.current_file()
@@ -1,6 +1,7 @@
 import pyblish.api
 
 from ayon_core.pipeline import registered_host, KnownPublishError
+from ayon_loki.api import wait_for_background_save
 
 
 class SaveCurrentScene(pyblish.api.ContextPlugin):
@@ -27,4 +28,18 @@ class SaveCurrentScene(pyblish.api.ContextPlugin):
             )
 
         self.log.debug(f"Saving current file: {current_file}")
-        host.save_workfile(current_file)
\ No newline at end of file
+        results = host.save_workfile(current_file)
+
+        # Extractors may read the workfile, so it must be fully written
+        # before publishing continues when it is saved in the background
+        try:
+            results = results or wait_for_background_save()
+        except Exception as exc:
+            raise KnownPublishError(
+                f"Saving the current file in the background failed: {exc}"
+            ) from exc
+        for result in results:
+            self.log.debug(
+                f"Saved {result['bytes']} bytes in {result['duration']:.3f}s:"
+                f" {result['path']}"
+            )
\ No newline at end of file
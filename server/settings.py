@@ -1,4 +1,8 @@
-from ayon_server.settings import BaseSettingsModel, SettingsField
+from ayon_server.settings import (
+    BaseSettingsModel,
+    SettingsField,
+    task_types_enum,
+)
 
 from .imageio import LokiImageIOModel
 
@@ -10,11 +14,119 @@ DEFAULT_VALUES = {
             "rules": []
         }
     },
+    "workfile_save": {
+        "background": False
+    },
+    "workfile_open": {
+        "batch_size": 10,
+        "profiles": []
+    },
+    "tools": {
+        "prewarm": []
+    },
 }
 
 
+class WorkfileSaveModel(BaseSettingsModel):
+    background: bool = SettingsField(
+        False,
+        title="Save In Background",
+        description=(
+            "Write the layers to disk on a background thread so the "
+            "application stays responsive while saving the workfile."
+        )
+    )
+
+
+def payload_load_enum():
+    return [
+        {"value": "all", "label": "All payloads"},
+        {"value": "rules", "label": "Payloads loaded when last saved"},
+        {"value": "none", "label": "No payloads"},
+    ]
+
+
+class WorkfileOpenProfileModel(BaseSettingsModel):
+    _layout = "expanded"
+    task_types: list[str] = SettingsField(
+        default_factory=list,
+        title="Task Types",
+        enum_resolver=task_types_enum
+    )
+    load: str = SettingsField(
+        "all",
+        title="Load Payloads",
+        enum_resolver=payload_load_enum,
+        description=(
+            "Which payloads to load when opening the workfile. The payloads "
+            "loaded when last saved are stored in the workfile."
+        )
+    )
+    deferred: bool = SettingsField(
+        False,
+        title="Load In Background",
+        description=(
+            "Open the workfile without payloads and load them in the "
+            "background afterwards, so the workfile is usable right away."
+        )
+    )
+
+
+class WorkfileOpenModel(BaseSettingsModel):
+    batch_size: int = SettingsField(
+        10,
+        ge=1,
+        title="Payloads Per Step",
+        description=(
+            "Number of payloads to load per step when loading in the "
+            "background. Smaller steps keep the application more responsive."
+        )
+    )
+    profiles: list[WorkfileOpenProfileModel] = SettingsField(
+        default_factory=list,
+        title="Profiles",
+        description=(
+            "Workfiles of tasks without a matching profile are opened with "
+            "all payloads loaded."
+        )
+    )
+
+
+def prewarm_tools_enum():
+    return [
+        {"value": "publisher", "label": "Publisher"},
+        {"value": "loader", "label": "Loader"},
+        {"value": "scene_inventory", "label": "Scene Inventory"},
+        {"value": "workfiles", "label": "Workfiles"},
+    ]
+
+
+class ToolsModel(BaseSettingsModel):
+    prewarm: list[str] = SettingsField(
+        default_factory=list,
+        title="Pre-warm Tools",
+        enum_resolver=prewarm_tools_enum,
+        description=(
+            "Tools to build in the background while Loki is idle after "
+            "startup, so their first open from the AYON menu is fast."
+        )
+    )
+
+
 class LokiSettings(BaseSettingsModel):
     imageio: LokiImageIOModel = SettingsField(
         default_factory=LokiImageIOModel,
         title="Color Management (ImageIO)"
     )
+    workfile_save: WorkfileSaveModel = SettingsField(
+        default_factory=WorkfileSaveModel,
+        title="Workfile Save"
+    )
+    workfile_open: WorkfileOpenModel = SettingsField(
+        default_factory=WorkfileOpenModel,
+        title="Workfile Open"
+    )
+    tools: ToolsModel = SettingsField(
+        default_factory=ToolsModel,
+        title="Tools"
+    )
@@ -0,0 +1,137 @@
+"""Shared fixtures of the Loki integration tests and benchmarks.
+
+The tests run without the OpenDCC application. The current stage is held by
+the `InMemoryBackend`, so the scan, load, create and save code paths run
+the same way they do inside Loki.
+
+Benchmarks on large synthetic stages are marked `slow` and only run with
+`--run-slow`.
+"""
+import os
+import sys
+
+import pytest
+
+from pxr import Sdf, Usd
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "client")
+)
+
+from ayon_core.pipeline import AYON_CONTAINER_ID  # noqa: E402
+
+from ayon_loki.api import backends  # noqa: E402
+from ayon_loki.api.containers import get_container_index  # noqa: E402
+from ayon_loki.api.dirty_layers import get_dirty_layer_tracker  # noqa: E402
+from ayon_loki.api.layer_data import get_layer_data_cache  # noqa: E402
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-slow",
+        action="store_true",
+        default=False,
+        help="Run the benchmarks on large synthetic stages."
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "slow: benchmark on a large stage, needs --run-slow"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-slow"):
+        return
+
+    skip_slow = pytest.mark.skip(reason="needs --run-slow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
+@pytest.fixture(autouse=True)
+def reset_caches():
+    """Start every test without notice listeners or cached layer state."""
+    yield
+    get_container_index().deregister()
+    get_dirty_layer_tracker().deregister()
+    get_layer_data_cache().deregister()
+
+
+@pytest.fixture
+def stage():
+    return Usd.Stage.CreateInMemory()
+
+
+@pytest.fixture
+def backend(stage):
+    """Make `stage` the current stage of an in-memory backend."""
+    backend = backends.InMemoryBackend(stage)
+    backends.set_backend(backend)
+    yield backend
+    backends.set_backend(None)
+
+
+@pytest.fixture
+def workfile(tmp_path):
+    """Return the path of a saved workfile with a single sublayer."""
+    sublayer = Sdf.Layer.CreateNew(str(tmp_path / "sublayer.usda"))
+    sublayer.Save()
+    root_layer = Sdf.Layer.CreateNew(str(tmp_path / "workfile.usda"))
+    root_layer.subLayerPaths.append(sublayer.identifier)
+    root_layer.Save()
+    return root_layer.identifier
+
+
+@pytest.fixture
+def workfile_backend(workfile):
+    """Make the opened `workfile` the current stage of the backend."""
+    backend = backends.InMemoryBackend(Usd.Stage.Open(workfile))
+    backends.set_backend(backend)
+    yield backend
+    backends.set_backend(None)
+
+
+def make_container_data(index: int, loader: str = "ReferenceLoader") -> dict:
+    return {
+        "schema": "ayon:container-3.0",
+        "id": AYON_CONTAINER_ID,
+        "loader": loader,
+        "representation": f"representation_{index}",
+        "project_name": "test_project",
+    }
+
+
+@pytest.fixture
+def author_prims():
+    """Return a function authoring synthetic prims in a layer.
+
+    Every `container_every`-th prim references an asset with container
+    data, the other prims are plain defs. Prims are grouped per thousand so
+    no single prim gets an enormous list of children.
+
+    """
+    def _author_prims(
+        layer: Sdf.Layer,
+        count: int,
+        container_every: int = 100
+    ) -> list[Sdf.Path]:
+        paths = []
+        with Sdf.ChangeBlock():
+            for index in range(count):
+                path = Sdf.Path(
+                    f"/root/group_{index // 1000}/prim_{index}"
+                )
+                spec = Sdf.CreatePrimInLayer(layer, path)
+                spec.specifier = Sdf.SpecifierDef
+                if index % container_every == 0:
+                    spec.referenceList.Prepend(Sdf.Reference(
+                        assetPath=f"asset_{index}.usd",
+                        customData={"AYON": make_container_data(index)}
+                    ))
+                    paths.append(path)
+        return paths
+
+    return _author_prims
@@ -0,0 +1,169 @@
+import pytest
+
+from pxr import Sdf
+
+from ayon_core.pipeline import AYON_CONTAINER_ID
+from ayon_loki.api.containers import ContainerIndex, scan_layer
+from ayon_loki.api.pipeline import iter_containers
+
+
+@pytest.fixture
+def container_index():
+    index = ContainerIndex()
+    yield index
+    index.deregister()
+
+
+def get_container_keys(containers) -> set[tuple[str, str]]:
+    return {
+        (container["namespace"], container["representation"])
+        for container in containers
+    }
+
+
+def test_iter_containers(stage, backend, author_prims):
+    paths = author_prims(stage.GetRootLayer(), 1000)
+
+    containers = list(iter_containers())
+
+    assert sorted(container["namespace"] for container in containers) == (
+        sorted(path.pathString for path in paths)
+    )
+    assert next(iter_containers(loader="UnknownLoader"), None) is None
+
+
+def author_container(layer: Sdf.Layer, path: str):
+    spec = Sdf.CreatePrimInLayer(layer, path)
+    spec.specifier = Sdf.SpecifierDef
+    spec.referenceList.Append(Sdf.Reference(
+        assetPath="asset.usd",
+        customData={"AYON": {
+            "id": AYON_CONTAINER_ID,
+            "loader": "ReferenceLoader",
+            "representation": f"representation_{path}",
+        }}
+    ))
+
+
+def test_incremental_index_matches_rescan(
+    stage, author_prims, container_index
+):
+    layer = stage.GetRootLayer()
+    paths = author_prims(layer, 3000, container_every=30)
+    assert len(list(container_index.iter_containers(stage))) == 100
+
+    # Add a container prim and a container below a plain prim
+    author_container(layer, "/root/group_0/prim_added")
+    author_container(layer, "/root/group_1/prim_1001/child")
+
+    # Remove a container prim, the container of a prim and a whole group
+    del layer.GetPrimAtPath("/root/group_0").nameChildren[paths[1].name]
+    layer.GetPrimAtPath(paths[2]).referenceList.ClearEdits()
+    del layer.GetPrimAtPath("/root").nameChildren["group_2"]
+
+    # Rename a container prim and then its parent group
+    layer.GetPrimAtPath(paths[50]).name = "prim_renamed"
+    layer.GetPrimAtPath("/root/group_1").name = "group_renamed"
+
+    containers = list(container_index.iter_containers(stage))
+    assert get_container_keys(containers) == get_container_keys(
+        container
+        for spec_containers in scan_layer(layer).values()
+        for container in spec_containers
+    )
+    namespaces = {container["namespace"] for container in containers}
+    assert "/root/group_renamed/prim_renamed" in namespaces
+    assert "/root/group_renamed/prim_1001/child" in namespaces
+    assert paths[1].pathString not in namespaces
+
+
+def author_variants(layer: Sdf.Layer, path: str, selection: str):
+    spec = Sdf.CreatePrimInLayer(layer, path)
+    spec.specifier = Sdf.SpecifierDef
+    variant_set = Sdf.VariantSetSpec(spec, "v")
+    for name in ("x", "y"):
+        Sdf.VariantSpec(variant_set, name)
+    spec.variantSetNameList.Prepend("v")
+    spec.variantSelections["v"] = selection
+
+
+def test_incremental_index_variants(stage, container_index):
+    layer = stage.GetRootLayer()
+    author_variants(layer, "/V", "x")
+    author_container(layer, "/V{v=x}A")
+    assert stage.GetPrimAtPath("/V/A")
+    assert len(list(container_index.iter_containers(stage))) == 1
+
+    # Add containers inside the selected and the unselected variant
+    author_container(layer, "/V{v=x}D")
+    author_container(layer, "/V{v=y}C")
+    namespaces = {
+        container["namespace"]
+        for container in container_index.iter_containers(stage)
+    }
+    assert namespaces == {"/V{v=x}A", "/V{v=x}D", "/V{v=y}C"}
+
+    # Remove a container from each variant
+    del layer.GetObjectAtPath("/V{v=x}").primSpec.nameChildren["A"]
+    del layer.GetObjectAtPath("/V{v=y}").primSpec.nameChildren["C"]
+    namespaces = {
+        container["namespace"]
+        for container in container_index.iter_containers(stage)
+    }
+    assert namespaces == {"/V{v=x}D"}
+
+
+@pytest.mark.parametrize("count", [
+    10000,
+    pytest.param(100000, marks=pytest.mark.slow),
+    pytest.param(1000000, marks=pytest.mark.slow),
+])
+def test_benchmark_container_scan_cold(
+    benchmark, stage, author_prims, count
+):
+    author_prims(stage.GetRootLayer(), count)
+
+    def _scan():
+        index = ContainerIndex()
+        try:
+            return list(index.iter_containers(stage))
+        finally:
+            index.deregister()
+
+    containers = benchmark.pedantic(_scan, rounds=3)
+
+    assert len(containers) == count // 100
+
+
+@pytest.mark.parametrize("count", [
+    10000,
+    pytest.param(100000, marks=pytest.mark.slow),
+    pytest.param(1000000, marks=pytest.mark.slow),
+])
+def test_benchmark_container_scan_incremental(
+    benchmark, stage, author_prims, container_index, count
+):
+    layer = stage.GetRootLayer()
+    author_prims(layer, count)
+    list(container_index.iter_containers(stage))
+    names = iter(range(1000000))
+
+    def _edit():
+        # Add a prim so every scan has a dirty path to refresh
+        spec = Sdf.CreatePrimInLayer(layer, f"/added_{next(names)}")
+        spec.specifier = Sdf.SpecifierDef
+
+    def _scan():
+        return list(container_index.iter_containers(stage))
+
+    benchmark.pedantic(_scan, setup=_edit, rounds=100)
+
+
+def test_benchmark_iter_containers_indexed(benchmark, stage, author_prims):
+    author_prims(stage.GetRootLayer(), 10000)
+    index = ContainerIndex()
+    list(index.iter_containers(stage))
+
+    containers = benchmark(lambda: list(index.iter_containers(stage)))
+
+    assert len(containers) == 100
@@ -0,0 +1,152 @@
+import logging
+
+import pytest
+
+from pxr import Sdf
+
+from ayon_core.pipeline import AYON_INSTANCE_ID
+from ayon_loki.api import lib, plugin
+
+
+class FakeCreatedInstance:
+    """Created instance holding its data, without a create context."""
+
+    def __init__(self, product_type, product_name, data, creator):
+        self.data = {
+            **data,
+            "id": AYON_INSTANCE_ID,
+            "productType": product_type,
+            "productName": product_name,
+            "creator_identifier": creator.identifier,
+        }
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def data_to_store(self):
+        return dict(self.data)
+
+
+class FakeChanges:
+    """Changes of a created instance, only holding the changed keys."""
+
+    def __init__(self, changed_keys):
+        self.changed_keys = changed_keys
+
+
+class CreatorForTests(plugin.LokiCreator):
+    identifier = "io.ayon.creators.loki.test"
+    label = "Test"
+    product_type = "test"
+    log = logging.getLogger(__name__)
+
+    def __init__(self):
+        # Skip the create context and settings of the base class
+        self.instances = []
+
+    def _add_instance_to_context(self, instance):
+        self.instances.append(instance)
+
+
+@pytest.fixture
+def creator(monkeypatch):
+    monkeypatch.setattr(plugin, "CreatedInstance", FakeCreatedInstance)
+    return CreatorForTests()
+
+
+def create_instances(creator, count: int) -> list:
+    return creator.create_instances(
+        [("productMain", {"folderPath": "/asset"})] * count,
+        {"use_selection": False}
+    )
+
+
+def test_create_instance_specs(stage):
+    stage.DefinePrim(lib.AYON_INSTANCES_ROOT.AppendChild("productMain"))
+
+    with lib.count_stage_changes(stage) as changes:
+        specs = plugin.LokiCreatorBase.create_instance_specs(
+            stage, ["productMain"] * 3 + ["other"]
+        )
+
+    assert changes["count"] == 1
+    assert [spec.name for spec in specs] == [
+        "productMain1", "productMain2", "productMain3", "other"
+    ]
+    for spec in specs:
+        prim = stage.GetPrimAtPath(spec.path)
+        assert prim.GetTypeName() == "Scope"
+        assert prim.HasAPI("CollectionAPI", lib.INSTANCE_COLLECTION_NAME)
+
+
+@pytest.mark.parametrize("count", [10, 100])
+def test_create_instances(stage, backend, creator, count):
+    with lib.count_stage_changes(stage) as changes:
+        instances = create_instances(creator, count)
+
+    assert changes["count"] == 1
+    assert len(instances) == count
+    assert instances == creator.instances
+    paths = {instance.data["instance_node"] for instance in instances}
+    assert len(paths) == count
+
+    instances_data = lib.get_instances_data(stage)
+    assert {path.pathString for path in instances_data} == paths
+    for data in instances_data.values():
+        assert data["folderPath"] == "/asset"
+        assert "instance_node" not in data
+
+
+def test_update_instances(stage, backend, creator):
+    instances = create_instances(creator, 100)
+    stored_before = lib.get_instances_data(stage)
+
+    update_list = []
+    for index, instance in enumerate(instances):
+        instance.data["productName"] = f"productRenamed{index}"
+        # Not reported as changed, so it must not be written
+        instance.data["folderPath"] = "/other_asset"
+        update_list.append((instance, FakeChanges(["productName"])))
+
+    with lib.count_stage_changes(stage) as changes:
+        creator.update_instances(update_list)
+
+    assert changes["count"] == 1
+    stored_after = lib.get_instances_data(stage)
+    for index, instance in enumerate(instances):
+        path = Sdf.Path(instance.data["instance_node"])
+        assert stored_after[path] == {
+            **stored_before[path], "productName": f"productRenamed{index}"
+        }
+
+
+def test_create_instances_includes(stage, backend, creator):
+    stage.DefinePrim("/asset_a")
+    stage.DefinePrim("/asset_b")
+    includes = [[Sdf.Path("/asset_a")], [Sdf.Path("/asset_b")]]
+
+    instances = creator.create_instances(
+        [("productMain", {}), ("productMain", {})], {}, includes=includes
+    )
+
+    for instance, paths, other_paths in zip(
+        instances, includes, reversed(includes)
+    ):
+        prim = stage.GetPrimAtPath(instance.data["instance_node"])
+        query = lib.compute_membership_query(prim)
+        assert query.IsPathIncluded(paths[0])
+        assert not query.IsPathIncluded(other_paths[0])
+
+
+@pytest.mark.parametrize("count", [10, 100, 1000])
+def test_benchmark_create_instances(
+    benchmark, stage, backend, creator, count
+):
+    def _setup():
+        stage.RemovePrim(lib.AYON_INSTANCES_ROOT)
+
+    benchmark.pedantic(
+        create_instances, args=(creator, count), setup=_setup, rounds=5
+    )
+
+    assert len(lib.get_instances_data(stage)) == count
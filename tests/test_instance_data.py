@@ -0,0 +1,189 @@
+import json
+
+import pytest
+
+from pxr import Sdf, Usd
+
+from ayon_core.pipeline import AYON_INSTANCE_ID
+from ayon_loki.api import lib, workio
+
+
+def make_instance_data(index: int) -> dict:
+    return {
+        "id": AYON_INSTANCE_ID,
+        "creator_identifier": "io.ayon.creators.loki.usd",
+        "productName": f"usdMain{index}",
+        "folderPath": "/assets/chair",
+        "active": True,
+        "frameStart": 1001,
+        "fps": 25.0,
+        "task": None,
+        "families": ["usd", "review"],
+        "creator_attributes": {"frames": "current", "farm": False},
+        "comment": lib.JSON_PREFIX + "not actually json",
+    }
+
+
+def author_legacy_instances(
+    layer: Sdf.Layer,
+    count: int
+) -> list[Sdf.PrimSpec]:
+    """Author instances with one `ayon:` attribute per data key."""
+    type_names = {
+        bool: Sdf.ValueTypeNames.Bool,
+        int: Sdf.ValueTypeNames.Int,
+        float: Sdf.ValueTypeNames.Double,
+        str: Sdf.ValueTypeNames.String,
+    }
+    specs = []
+    with Sdf.ChangeBlock():
+        for index in range(count):
+            spec = Sdf.CreatePrimInLayer(
+                layer, lib.AYON_INSTANCES_ROOT.AppendChild(f"usd{index}")
+            )
+            spec.specifier = Sdf.SpecifierDef
+            for key, value in make_instance_data(index).items():
+                type_name = type_names.get(type(value))
+                if type_name is None or (
+                    isinstance(value, str)
+                    and value.startswith(lib.JSON_PREFIX)
+                ):
+                    type_name = Sdf.ValueTypeNames.String
+                    value = lib.JSON_PREFIX + json.dumps(value)
+                attr_spec = Sdf.AttributeSpec(
+                    spec, f"{lib.INSTANCE_LEGACY_NAMESPACE}{key}", type_name
+                )
+                attr_spec.default = value
+            specs.append(spec)
+    return specs
+
+
+def reopen(stage: Usd.Stage, path: str) -> Usd.Stage:
+    """Return the stage opened again from its root layer saved to `path`."""
+    stage.GetRootLayer().Export(path)
+    return Usd.Stage.Open(Sdf.Layer.OpenAsAnonymous(path))
+
+
+@pytest.mark.parametrize("as_json", [False, True])
+def test_write_read_round_trip(stage, as_json):
+    spec = Sdf.CreatePrimInLayer(
+        stage.GetRootLayer(), lib.AYON_INSTANCES_ROOT.AppendChild("usd")
+    )
+    data = make_instance_data(0)
+
+    lib.write_instance_data(spec, data, as_json=as_json)
+
+    assert lib.read_instance_data(spec) == data
+    stored = spec.customData[lib.INSTANCE_DATA_KEY]
+    assert stored[lib.INSTANCE_DATA_VERSION_KEY] == lib.INSTANCE_DATA_VERSION
+    assert (lib.INSTANCE_DATA_JSON_KEY in stored) == as_json
+
+
+def test_update_instance_data(stage):
+    spec = Sdf.CreatePrimInLayer(
+        stage.GetRootLayer(), lib.AYON_INSTANCES_ROOT.AppendChild("usd")
+    )
+    lib.write_instance_data(spec, make_instance_data(0))
+    # Store an unchanged value in another encoding of the same value, which
+    # is only kept if the value is not encoded again
+    stored = dict(spec.customData[lib.INSTANCE_DATA_KEY])
+    stored["families"] = lib.JSON_PREFIX + '["usd",  "review"]'
+    spec.customData[lib.INSTANCE_DATA_KEY] = stored
+
+    with lib.count_stage_changes(stage) as changes:
+        lib.update_instance_data(spec, {"productName": "usdMain0"})
+    assert changes["count"] == 0
+
+    lib.update_instance_data(spec, {"productName": "usdRenamed"}, ["comment"])
+
+    updated = spec.customData[lib.INSTANCE_DATA_KEY]
+    assert updated["families"] == stored["families"]
+    assert updated["productName"] == "usdRenamed"
+    assert "comment" not in updated
+    expected = make_instance_data(0)
+    expected["productName"] = "usdRenamed"
+    del expected["comment"]
+    assert lib.read_instance_data(spec) == expected
+
+
+@pytest.mark.parametrize("extension", ["usda", "usdc"])
+@pytest.mark.parametrize("as_json", [False, True])
+def test_migrate_round_trip(stage, tmp_path, as_json, extension):
+    specs = author_legacy_instances(stage.GetRootLayer(), 10)
+    legacy_data = lib.get_instances_data(stage)
+    assert len(legacy_data) == 10
+    assert legacy_data[specs[0].path] == make_instance_data(0)
+
+    assert lib.migrate_instances_data(stage, as_json=as_json) == 10
+    assert lib.migrate_instances_data(stage, as_json=as_json) == 0
+
+    for spec in specs:
+        assert not any(
+            attr_spec.name.startswith(lib.INSTANCE_LEGACY_NAMESPACE)
+            for attr_spec in spec.attributes
+        )
+    assert lib.get_instances_data(stage) == legacy_data
+    saved_stage = reopen(stage, str(tmp_path / f"workfile.{extension}"))
+    assert lib.get_instances_data(saved_stage) == legacy_data
+
+
+def test_save_file_migrates(workfile_backend, monkeypatch):
+    monkeypatch.setattr(workio, "get_workfile_open_profile", lambda: {
+        "load": "all",
+        "deferred": False,
+        "batch_size": 10,
+    })
+    stage = workfile_backend.stage
+    author_legacy_instances(stage.GetRootLayer(), 10)
+    legacy_data = lib.get_instances_data(stage)
+
+    workio.save_file()
+
+    saved_stage = Usd.Stage.Open(
+        Sdf.Layer.OpenAsAnonymous(stage.GetRootLayer().realPath)
+    )
+    assert lib.migrate_instances_data(saved_stage) == 0
+    assert lib.get_instances_data(saved_stage) == legacy_data
+
+
+@pytest.mark.parametrize("extension", ["usda", "usdc"])
+def test_benchmark_imprint(benchmark, tmp_path, extension):
+    # The layer holds its data in memory the way the file format does
+    layer = Sdf.Layer.CreateNew(str(tmp_path / f"workfile.{extension}"))
+    author_legacy_instances(layer, 1000)
+    specs = list(layer.GetPrimAtPath(lib.AYON_INSTANCES_ROOT).nameChildren)
+    data = [make_instance_data(index) for index in range(1000)]
+
+    def _imprint():
+        with Sdf.ChangeBlock():
+            for spec, spec_data in zip(specs, data):
+                lib.write_instance_data(spec, spec_data)
+
+    benchmark(_imprint)
+
+
+@pytest.mark.parametrize("extension", ["usda", "usdc"])
+def test_benchmark_read(benchmark, stage, tmp_path, extension):
+    specs = author_legacy_instances(stage.GetRootLayer(), 1000)
+    for spec in specs:
+        lib.write_instance_data(spec, lib.read_instance_data(spec))
+    saved_stage = reopen(stage, str(tmp_path / f"workfile.{extension}"))
+
+    instances = benchmark(lib.get_instances_data, saved_stage)
+
+    assert len(instances) == 1000
+
+
+def test_benchmark_migrate(benchmark, stage):
+    layer = stage.GetRootLayer()
+
+    def _setup():
+        del layer.rootPrims[lib.AYON_INSTANCES_ROOT.name]
+        author_legacy_instances(layer, 1000)
+
+    author_legacy_instances(layer, 1)
+    count = benchmark.pedantic(
+        lib.migrate_instances_data, args=(stage,), setup=_setup, rounds=10
+    )
+
+    assert count == 1000
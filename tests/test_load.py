@@ -0,0 +1,213 @@
+import pytest
+
+from pxr import Sdf, Tf, Usd
+
+from ayon_loki.api import lib, plugin
+from ayon_loki.api.containers import ContainerIndex
+from ayon_loki.plugins.load.load_reference import ReferenceLoader
+
+
+def make_context(index: int, version: int = 1) -> dict:
+    return {
+        "project": {"name": "test_project"},
+        "product": {"name": "asset"},
+        "representation": {"id": f"representation_{index}_v{version}"},
+    }
+
+
+@pytest.fixture(autouse=True)
+def filepath_from_context(monkeypatch):
+    """Resolve representation paths without an AYON server."""
+    monkeypatch.setattr(
+        plugin.LokiLoader,
+        "filepath_from_context",
+        classmethod(lambda cls, context: (
+            f"/assets/{context['representation']['id']}.usd"
+        ))
+    )
+
+
+def load_references(stage, count: int) -> list[dict]:
+    loader = ReferenceLoader()
+    loader.load_batch([make_context(index) for index in range(count)])
+    return list(ContainerIndex().iter_containers(stage))
+
+
+def test_load_batch_unique_names(stage, backend):
+    containers = load_references(stage, 10)
+
+    names = [container["objectName"] for container in containers]
+    assert len(set(names)) == 10
+    assert stage.GetPrimAtPath("/asset")
+
+
+def test_update_batch(stage, backend):
+    containers = load_references(stage, 10)
+    loader = ReferenceLoader()
+
+    with lib.count_stage_changes(stage) as changes:
+        loader.update_batch([
+            (container, make_context(index, version=2))
+            for index, container in enumerate(containers)
+        ])
+
+    assert changes["count"] == 1
+    for container in ContainerIndex().iter_containers(stage):
+        assert container["representation"].endswith("_v2")
+
+
+def test_update_per_container(stage, backend):
+    # Baseline of `update_batch`: updating one container at a time
+    containers = load_references(stage, 10)
+    loader = ReferenceLoader()
+
+    with lib.count_stage_changes(stage) as changes:
+        for index, container in enumerate(containers):
+            loader.update(container, make_context(index, version=2))
+
+    assert changes["count"] == len(containers)
+
+
+def test_roots_fingerprint_cached(monkeypatch):
+    anatomy_projects = []
+
+    class Anatomy:
+        def __init__(self, project_name, project_entity=None):
+            anatomy_projects.append(project_name)
+            self.roots = {"work": f"/{project_name}/work"}
+
+    monkeypatch.setattr(plugin, "Anatomy", Anatomy)
+    monkeypatch.setattr(plugin.LokiLoader, "_roots_fingerprints", {})
+    project = {"name": "test_project", "updatedAt": "2024-01-01"}
+
+    for _ in range(100):
+        roots = plugin.LokiLoader._get_roots_fingerprint(project, "local")
+    assert roots == (("work", "/test_project/work"),)
+    assert len(anatomy_projects) == 1
+
+    # Another site or an updated project resolves the roots again
+    plugin.LokiLoader._get_roots_fingerprint(project, "studio")
+    project["updatedAt"] = "2024-01-02"
+    plugin.LokiLoader._get_roots_fingerprint(project, "local")
+    assert len(anatomy_projects) == 3
+
+
+def test_benchmark_load(benchmark, stage, backend):
+    loader = ReferenceLoader()
+    contexts = [make_context(index) for index in range(100)]
+
+    def _setup():
+        for prim in stage.GetPseudoRoot().GetChildren():
+            stage.RemovePrim(prim.GetPath())
+
+    benchmark.pedantic(
+        loader.load_batch, args=(contexts,), setup=_setup, rounds=10
+    )
+
+    assert len(stage.GetPseudoRoot().GetChildren()) == 100
+
+
+def get_update_items(stage, version: int) -> list[tuple[dict, dict]]:
+    """Return the current containers paired with a context to update to."""
+    containers = sorted(
+        ContainerIndex().iter_containers(stage),
+        key=lambda container: container["objectName"]
+    )
+    return [
+        (container, make_context(index, version))
+        for index, container in enumerate(containers)
+    ]
+
+
+def test_benchmark_update_batch(benchmark, stage, backend):
+    load_references(stage, 100)
+    loader = ReferenceLoader()
+    versions = iter(range(2, 1000000))
+
+    def _setup():
+        return (get_update_items(stage, next(versions)),), {}
+
+    def _update(items):
+        with lib.count_stage_changes(stage) as changes:
+            loader.update_batch(items)
+        return changes["count"]
+
+    count = benchmark.pedantic(_update, setup=_setup, rounds=20)
+
+    assert count == 1
+
+
+def test_benchmark_update_per_container(benchmark, stage, backend):
+    # Baseline of `test_benchmark_update_batch`
+    load_references(stage, 100)
+    loader = ReferenceLoader()
+    versions = iter(range(2, 1000000))
+
+    def _setup():
+        return (get_update_items(stage, next(versions)),), {}
+
+    def _update(items):
+        with lib.count_stage_changes(stage) as changes:
+            for container, context in items:
+                loader.update(container, context)
+        return changes["count"]
+
+    count = benchmark.pedantic(_update, setup=_setup, rounds=20)
+
+    assert count == 100
+
+
+def test_benchmark_unique_path(benchmark, stage, backend):
+    for index in range(1000):
+        stage.DefinePrim(f"/asset{index or ''}")
+
+    path = benchmark(lib.unique_path, stage, Sdf.Path("/asset"))
+
+    assert path == Sdf.Path("/asset1000")
+
+
+def test_benchmark_remove_prim(benchmark, stage, backend):
+    def _setup():
+        for index in range(100):
+            stage.DefinePrim(f"/asset_{index}/child")
+        return ([stage.GetPrimAtPath(f"/asset_{index}")
+                 for index in range(100)],), {}
+
+    def _remove_prims(prims):
+        for prim in prims:
+            lib.remove_prim(prim)
+
+    benchmark.pedantic(_remove_prims, setup=_setup, rounds=10)
+
+    assert not stage.GetPseudoRoot().GetChildren()
+
+
+def has_loki_metadata() -> bool:
+    """Return whether the stage metadata of Loki's USD plugins is known."""
+    try:
+        Usd.Stage.CreateInMemory().SetMetadata(
+            "minTimeCode", Sdf.TimeCode(0)
+        )
+    except Tf.ErrorException:
+        return False
+    return True
+
+
+@pytest.mark.skipif(
+    not has_loki_metadata(), reason="needs the USD plugins of Loki"
+)
+def test_benchmark_reset_frame_range(benchmark, stage, backend, monkeypatch):
+    monkeypatch.setattr(lib, "get_current_task_entity", lambda: {
+        "attrib": {
+            "frameStart": 1001,
+            "frameEnd": 1100,
+            "handleStart": 10,
+            "handleEnd": 10,
+            "fps": 25.0,
+        }
+    })
+
+    benchmark(lib.reset_frame_range)
+
+    assert stage.GetStartTimeCode() == 991
+    assert stage.GetEndTimeCode() == 1110
@@ -0,0 +1,92 @@
+"""Import time profile of installing the Loki host at launch.
+
+The imports of `ayon_loki.api.pipeline` are profiled with `-X importtime`
+in a new interpreter. Run with `-s` to print the slowest imports as a table.
+"""
+import os
+import subprocess
+import sys
+
+CLIENT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "client"
+)
+STARTUP_STATEMENT = "import ayon_loki.api.pipeline"
+
+# Modules that are only imported once a host method or menu action runs
+LAZY_MODULES = {
+    "ayon_loki.api.containers",
+    "ayon_loki.api.dirty_layers",
+    "ayon_loki.api.layer_data",
+    "ayon_loki.api.payloads",
+    "ayon_loki.api.tools",
+    "ayon_loki.api.workio",
+}
+
+
+def profile_imports(statement: str) -> list[tuple[str, int, int]]:
+    """Return the imports of the statement in a new interpreter.
+
+    Returns:
+        list[tuple[str, int, int]]: The module name, the time spent
+            importing the module itself and the time including its
+            imports, in microseconds, in the order the imports finished.
+
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        path for path in (CLIENT_DIR, env.get("PYTHONPATH")) if path
+    )
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    imports = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        imports.append((name.strip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+def format_imports_table(
+    imports: list[tuple[str, int, int]],
+    limit: int = 25
+) -> str:
+    """Return the slowest imports by cumulative time as a text table."""
+    rows = sorted(imports, key=lambda item: item[2], reverse=True)[:limit]
+    width = max([len(name) for name, _, _ in rows] + [len("module")])
+    lines = [
+        f"{'module':<{width}}  {'self [ms]':>10}  {'cumulative [ms]':>16}"
+    ]
+    for name, self_us, cumulative_us in rows:
+        lines.append(
+            f"{name:<{width}}  {self_us / 1000:>10.1f}  "
+            f"{cumulative_us / 1000:>16.1f}"
+        )
+    return "\n".join(lines)
+
+
+def test_startup_imports():
+    imports = profile_imports(STARTUP_STATEMENT)
+
+    print()
+    print(format_imports_table(imports))
+    imported = {name for name, _, _ in imports}
+    assert "ayon_loki.api.pipeline" in imported
+    assert not imported & LAZY_MODULES
+
+
+def test_benchmark_startup_imports(benchmark):
+    imports = benchmark.pedantic(
+        profile_imports, args=(STARTUP_STATEMENT,), rounds=5
+    )
+
+    cumulative_us = {name: cumulative for name, _, cumulative in imports}
+    benchmark.extra_info["pipeline_import_ms"] = (
+        cumulative_us["ayon_loki.api.pipeline"] / 1000
+    )
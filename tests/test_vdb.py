@@ -0,0 +1,149 @@
+import struct
+
+import pytest
+
+from ayon_loki.api import vdb
+
+
+def pack_string(value: str) -> bytes:
+    data = value.encode("utf-8")
+    return struct.pack("<I", len(data)) + data
+
+
+def pack_metadata(metadata: dict[str, str]) -> bytes:
+    data = struct.pack("<I", len(metadata))
+    for name, value in metadata.items():
+        data += pack_string(name) + pack_string("string") + pack_string(value)
+    return data
+
+
+def make_vdb(
+    version: int,
+    grids: list[tuple[str, str, dict[str, str]]],
+    has_grid_offsets: bool = True
+) -> bytes:
+    """Return the header, descriptors and metadata of an OpenVDB file.
+
+    Each grid is given as its unique name, tree type name and string
+    metadata. The voxel data of the grids is left out.
+
+    """
+    data = struct.pack("<qI", vdb.VDB_MAGIC, version)
+    if version >= vdb.FILE_VERSION_LIBRARY_VERSION:
+        data += struct.pack("<II", 10, 0)
+    if version >= vdb.FILE_VERSION_GRID_OFFSETS:
+        data += struct.pack("<b", has_grid_offsets)
+    if (
+        vdb.FILE_VERSION_SELECTIVE_COMPRESSION
+        <= version
+        < vdb.FILE_VERSION_NODE_MASK_COMPRESSION
+    ):
+        data += b"\x00"
+    if version >= vdb.FILE_VERSION_BOOST_UUID:
+        data += b"0" * 36
+    else:
+        data += b"\x00" * 16
+    data += pack_metadata({"creator": "test"})
+    data += struct.pack("<i", len(grids))
+
+    for unique_name, grid_type, metadata in grids:
+        descriptor = pack_string(unique_name) + pack_string(grid_type)
+        if version >= vdb.FILE_VERSION_GRID_INSTANCING:
+            descriptor += pack_string("")
+        grid = b""
+        if version >= vdb.FILE_VERSION_NODE_MASK_COMPRESSION:
+            grid += struct.pack("<I", 0)
+        grid += pack_metadata(metadata)
+
+        # The grid follows its descriptor and the next descriptor the grid
+        grid_pos = len(data) + len(descriptor) + 24
+        end_pos = grid_pos + len(grid)
+        data += descriptor + struct.pack("<qqq", grid_pos, end_pos, end_pos)
+        data += grid
+    return data
+
+
+def write_vdb(tmp_path, name: str, data: bytes) -> str:
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+GRIDS = [
+    ("density", "Tree_float_5_4_3", {"class": "fog volume"}),
+    ("vel", "Tree_vec3s_5_4_3_HalfFloat", {"class": "staggered"}),
+    ("surface", "Tree_float_5_4_3", {"class": "level set"}),
+]
+
+
+@pytest.mark.parametrize("version", [224, 222, 221, 218, 216, 212, 211, 210])
+def test_read_grid_descriptors(tmp_path, version):
+    path = write_vdb(tmp_path, "volume.vdb", make_vdb(version, GRIDS))
+
+    grids = vdb.read_grid_descriptors(path)
+
+    assert [grid["name"] for grid in grids] == ["density", "vel", "surface"]
+    assert [grid["type"] for grid in grids] == [
+        "Tree_float_5_4_3", "Tree_vec3s_5_4_3", "Tree_float_5_4_3"
+    ]
+    assert [vdb.get_field_data_type(grid) for grid in grids] == [
+        "float", "float3", "float"
+    ]
+    assert [vdb.get_field_class(grid) for grid in grids] == [
+        "fogVolume", "staggered", "levelSet"
+    ]
+
+
+def test_read_grid_descriptors_duplicate_names(tmp_path):
+    grids = [
+        ("density", "Tree_float_5_4_3", {}),
+        (f"density{vdb.GRID_NAME_SEPARATOR}1", "Tree_float_5_4_3", {}),
+    ]
+    path = write_vdb(tmp_path, "volume.vdb", make_vdb(224, grids))
+
+    grids = vdb.read_grid_descriptors(path)
+
+    assert [(grid["name"], grid["index"]) for grid in grids] == [
+        ("density", 0), ("density", 1)
+    ]
+    assert vdb.get_field_class(grids[0]) == "unknown"
+
+
+def test_read_grid_descriptors_streamed(tmp_path):
+    # Without grid offsets only the first grid can be read from the header
+    path = write_vdb(tmp_path, "volume.vdb", make_vdb(
+        224, GRIDS, has_grid_offsets=False
+    ))
+
+    grids = vdb.read_grid_descriptors(path)
+
+    assert [grid["name"] for grid in grids] == ["density"]
+    assert grids[0]["class"] == "fog volume"
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"not an OpenVDB file",
+    make_vdb(224, GRIDS)[:100],
+])
+def test_read_grid_descriptors_invalid(tmp_path, data):
+    path = write_vdb(tmp_path, "volume.vdb", data)
+
+    with pytest.raises(vdb.VDBHeaderError):
+        vdb.read_grid_descriptors(path)
+
+
+@pytest.mark.parametrize("frame_grids, expected", [
+    # Only the first and last frame are read if their grids match
+    ([GRIDS[:1], GRIDS[1:2], GRIDS[:1]], ["density"]),
+    ([GRIDS[:1], GRIDS[2:], GRIDS[1:2]], ["density", "surface", "vel"]),
+])
+def test_read_sequence_grid_descriptors(tmp_path, frame_grids, expected):
+    paths = [
+        write_vdb(tmp_path, f"volume.{frame}.vdb", make_vdb(224, grids))
+        for frame, grids in enumerate(frame_grids)
+    ]
+
+    grids = vdb.read_sequence_grid_descriptors(paths)
+
+    assert [grid["name"] for grid in grids] == expected
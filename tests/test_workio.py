@@ -0,0 +1,132 @@
+import os
+
+import pytest
+
+from pxr import Sdf, Usd
+
+from ayon_loki.api import workio
+
+
+@pytest.fixture(autouse=True)
+def open_profile(monkeypatch):
+    """Use the default workfile open profile without project settings."""
+    monkeypatch.setattr(workio, "get_workfile_open_profile", lambda: {
+        "load": "all",
+        "deferred": False,
+        "batch_size": 10,
+    })
+
+
+def edit_layers(stage: Usd.Stage, count: int = 100):
+    """Author prims in the root layer and its sublayer."""
+    root_layer = stage.GetRootLayer()
+    sublayer = Sdf.Layer.Find(root_layer.subLayerPaths[0])
+    for layer in (root_layer, sublayer):
+        with Sdf.ChangeBlock():
+            for index in range(count):
+                spec = Sdf.CreatePrimInLayer(
+                    layer, f"/{layer.GetDisplayName()[:-5]}/prim_{index}"
+                )
+                spec.specifier = Sdf.SpecifierDef
+
+
+def test_save_file(workfile_backend):
+    stage = workfile_backend.stage
+    edit_layers(stage)
+    assert workio.has_unsaved_changes()
+
+    results = workio.save_file()
+
+    assert len(results) == 2
+    assert not workio.has_unsaved_changes()
+    for layer in stage.GetLayerStack(includeSessionLayers=False):
+        assert not layer.dirty
+    saved_layer = Sdf.Layer.OpenAsAnonymous(stage.GetRootLayer().realPath)
+    assert saved_layer.GetPrimAtPath("/workfile/prim_0")
+    directory = os.path.dirname(stage.GetRootLayer().realPath)
+    assert sorted(os.listdir(directory)) == [
+        "sublayer.usda", "workfile.usda"
+    ]
+
+
+def test_save_file_as(workfile_backend, tmp_path):
+    stage = workfile_backend.stage
+    edit_layers(stage)
+    filepath = str(tmp_path / "workfile_v002.usda")
+
+    workio.save_file(filepath)
+
+    assert workfile_backend.get_current_stage() is stage
+    assert stage.GetRootLayer().realPath == filepath
+    assert not workio.has_unsaved_changes()
+    saved_layer = Sdf.Layer.OpenAsAnonymous(filepath)
+    assert saved_layer.GetPrimAtPath("/workfile/prim_0")
+    # The sublayer is saved in place and the previous workfile is kept
+    assert Sdf.Layer.OpenAsAnonymous(
+        str(tmp_path / "sublayer.usda")
+    ).GetPrimAtPath("/sublayer/prim_0")
+    assert not Sdf.Layer.OpenAsAnonymous(
+        str(tmp_path / "workfile.usda")
+    ).GetPrimAtPath("/workfile/prim_0")
+
+
+def test_save_file_as_usdc(workfile_backend, tmp_path):
+    edit_layers(workfile_backend.stage)
+    filepath = str(tmp_path / "workfile_v002.usdc")
+
+    workio.save_file(filepath)
+
+    stage = workfile_backend.get_current_stage()
+    assert stage.GetRootLayer().realPath == filepath
+    assert stage.GetPrimAtPath("/workfile/prim_0")
+    assert stage.GetPrimAtPath("/sublayer/prim_0")
+    assert not workio.has_unsaved_changes()
+    with open(filepath, "rb") as f:
+        assert f.read(len(workio.USDC_MAGIC)) == workio.USDC_MAGIC
+
+
+def test_background_save(workfile_backend):
+    stage = workfile_backend.stage
+    edit_layers(stage)
+    layers = workio.get_unsaved_layers()
+
+    background_save = workio.BackgroundSave(layers)
+    background_save.start()
+    results = background_save.wait()
+
+    assert len(results) == 2
+    assert not workio.has_unsaved_changes()
+    root_path = stage.GetRootLayer().realPath
+    with open(root_path, "rb") as f:
+        assert not f.read().startswith(workio.USDC_MAGIC)
+    saved_layer = Sdf.Layer.OpenAsAnonymous(root_path)
+    assert saved_layer.GetPrimAtPath("/workfile/prim_0")
+
+    # Edits after the snapshot make the layer unsaved again
+    stage.DefinePrim("/workfile/edited")
+    assert workio.get_unsaved_layers() == [stage.GetRootLayer()]
+
+
+def test_benchmark_save_layers(benchmark, workfile_backend):
+    stage = workfile_backend.stage
+    layers = stage.GetLayerStack(includeSessionLayers=False)
+    edit_layers(stage, count=1000)
+
+    results = benchmark(workio.save_layers, layers)
+
+    assert len(results) == 2
+
+
+def test_benchmark_save_file(benchmark, workfile_backend):
+    stage = workfile_backend.stage
+    edit_layers(stage, count=1000)
+    prim = stage.GetPrimAtPath("/workfile/prim_0")
+    frames = iter(range(1000000))
+
+    def _setup():
+        # Edit the workfile so there is something to save each round
+        prim.SetMetadata("comment", f"edit {next(frames)}")
+
+    benchmark.pedantic(workio.save_file, setup=_setup, rounds=20)
+
+    assert not workio.has_unsaved_changes()